@@ -31,9 +31,32 @@ stringmodifier.gedit-plugin    -- Plugin.
 stringmodifier/                -- Package directory
     __init__.py                -- Package module loaded by Gedit.
     stringmod.py               -- Plugin and plugin helper classes.
+    engine.py                  -- Text transformations, independent of gtk.
+    modifiers.py               -- Modifiers set up from the configuration.
+    pipeline.py                -- Pipelines of modifier steps run in one pass.
+    template.py                -- Modifiers defined by templates.
+    scanner.py                 -- Reverse modifiers, parsing arrays back to text.
+    bufferops.py               -- Edit operations on a gedit document.
+    worker.py                  -- Thread running transformations in background.
+    cache.py                   -- Cache of the results of the modifiers.
+    accels.py                  -- Index of the accelerators in use.
+    timing.py                  -- Timings of the phases of the modifications.
+    bench.py                   -- Benchmarks of the modifiers.
+    config.py                  -- Configuration file reading and writing.
+    batch.py                   -- Command line batch mode.
+    __main__.py                -- Entry point of python -m stringmodifier.
     strmodconf.py              -- Configuration window class.
     strmodconf.glade           -- Configuration window layout from Glade.
+    strmodpanel.py             -- Timings panel.
 
 """
-from stringmod import StringModPlugin
+try:
+    import gedit
+except ImportError:
+    # Not loaded by gedit (no gtk/gedit available), only the gtk independent
+    # modules such as engine can be used.
+    pass
+else:
+    # Inside gedit, errors of the plugin's modules have to show up
+    from stringmod import StringModPlugin
 
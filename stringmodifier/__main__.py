@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+#
+#  Command line entry point of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+Entry point of python -m stringmodifier, see the batch module.
+
+"""
+
+import sys
+
+from stringmodifier.batch import main
+
+sys.exit(main())
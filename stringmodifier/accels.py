@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+#  Accelerators of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module keeps track of the accelerators in use, so that the
+configuration dialog finds out whether a shortcut key is taken by looking it
+up, instead of trying to change the global accel map. It does not depend on
+gtk: accelerators are (key value, modifier mask) pairs, as gtk gives them,
+and actions are known by their accel map path.
+
+Classes:
+AccelRegistry
+
+Functions:
+action_path
+action_name
+
+"""
+
+# Accel map path of the actions of the plugin
+ACTION_PATH = '<Actions>/StringModPluginActions/'
+
+# Actions with configurable accelerators, in the order of the Accel* options
+ACCEL_ACTIONS = ('Braces', 'Brackets', 'Quotes', 'Custom',
+                 'Str2CharArray', 'Str2WordArray', 'Str2ByteArray')
+
+
+def action_path(name):
+    """Return the accel map path of the action name of the plugin."""
+    return ACTION_PATH + name
+
+
+def action_name(path):
+    """Return the name of the action of the accel map path, e.g. FileSave."""
+    return path.rsplit('/', 1)[-1]
+
+
+class AccelRegistry(object):
+    """
+    Index of the accelerators in use by accel map path, and of the paths by
+    accelerator. An accelerator with a key value of 0 is no accelerator.
+
+    """
+
+    def __init__(self, entries=()):
+        self._paths = {}
+        self._accels = {}
+        for path, keyval, mods in entries:
+            self.assign(path, keyval, mods)
+
+    def assign(self, path, keyval, mods):
+        """Make (keyval, mods) the accelerator of path, replacing its old one."""
+        self.remove(path)
+        if not keyval:
+            return
+        accel = (keyval, mods)
+        self._accels[path] = accel
+        self._paths.setdefault(accel, set()).add(path)
+
+    def remove(self, path):
+        """Drop the accelerator of path, if it has one."""
+        accel = self._accels.pop(path, None)
+        if accel is None:
+            return
+        paths = self._paths[accel]
+        paths.discard(path)
+        if not paths:
+            del self._paths[accel]
+
+    def owner(self, keyval, mods, path=None):
+        """
+        Return the path of an action other than path which uses the
+        accelerator (keyval, mods), None if it is free. The first path in
+        sort order is returned if several actions use it.
+
+        """
+        others = self._paths.get((keyval, mods), ())
+        others = sorted(other for other in others if other != path)
+        if not others:
+            return None
+        return others[0]
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+#
+#  Command line batch mode of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module applies the modifiers outside of gedit, to the standard input,
+to files or to whole directory trees, with the options of the plugin's
+configuration file:
+
+    python -m stringmodifier [--config FILE] [--set NAME=VALUE ...]
+                             [--output FILE | --output-dir DIR] [--jobs N]
+                             MODIFIER [FILE|DIRECTORY ...]
+
+Without FILE the standard input is modified. Directories are walked
+recursively. The files are modified by a pool of worker processes; their
+results are written to the standard output (or --output) in the order of
+the inputs, or each to a file of its own under --output-dir, at the same
+relative path.
+
+The results are written piece by piece as the modifier produces them. The
+enclose and per line modifiers also read their input in blocks, and byte
+arrays of utf-8 files are made from the memory mapped file; the other
+modifiers read one whole input at a time per worker.
+
+Functions:
+iter_modify
+modify_file
+main
+
+"""
+
+import io
+import os
+import re
+import sys
+import codecs
+import shutil
+import fnmatch
+import argparse
+import tempfile
+import multiprocessing
+
+from . import config
+from . import engine
+from . import modifiers
+
+# Length of the blocks in which the streaming modifiers read their input
+BLOCK_SIZE = 1024 * 1024
+
+# Under Python 2 the text is kept utf-8 encoded, as gedit hands it to the
+# plugin, instead of being decoded
+_native_bytes = str is bytes
+
+
+def _text_reader(binary_file, encoding):
+    if _native_bytes:
+        return binary_file
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
+
+
+def _text_writer(binary_file, encoding):
+    if _native_bytes:
+        return binary_file
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
+
+
+def _iter_blocks(input_file, whole_lines):
+    while True:
+        if whole_lines:
+            block = ''.join(input_file.readlines(BLOCK_SIZE))
+        else:
+            block = input_file.read(BLOCK_SIZE)
+        if not block:
+            break
+        yield block
+
+
+def _iter_enclose_blocks(input_file, opening_symbol, closing_symbol):
+    yield opening_symbol
+    for block in _iter_blocks(input_file, False):
+        yield block
+    yield closing_symbol
+
+
+def _iter_per_line_blocks(input_file, transform):
+    for block in _iter_blocks(input_file, True):
+        for piece in transform(block):
+            yield piece
+
+
+def iter_modify(name, options, input_file, file_name=None):
+    """
+    Return an iterator over the pieces of the text read from input_file,
+    modified by the modifier name as set up by options.
+
+    file_name, if given, is the name of a utf-8 file holding the same text
+    as input_file; byte arrays are then made from the file itself.
+
+    """
+    symbols = modifiers.enclosure(name, options)
+    if symbols:
+        return _iter_enclose_blocks(input_file, symbols[0], symbols[1])
+
+    transform = modifiers.get_transform(name, options)
+    if modifiers.per_line_base(name):
+        # Lines are modified on their own, so blocks of whole lines can be
+        # modified one after the other
+        return _iter_per_line_blocks(input_file, transform)
+    elif name == 'Str2ByteArray' and file_name:
+        return engine.iter_file_byte_array(
+            file_name, **modifiers.byte_array_options(options))
+    return transform(input_file.read())
+
+
+def _is_utf8(encoding):
+    return _native_bytes or codecs.lookup(encoding).name == 'utf-8'
+
+
+def modify_file(name, options, input_name, output_file, encoding='utf-8'):
+    """
+    Write the content of the file input_name, modified by the modifier name
+    as set up by options, into output_file, a text file object.
+
+    """
+    input_file = _text_reader(open(input_name, 'rb'), encoding)
+    try:
+        file_name = input_name if _is_utf8(encoding) else None
+        for piece in iter_modify(name, options, input_file, file_name):
+            output_file.write(piece)
+    finally:
+        input_file.close()
+
+
+def _run_task(task):
+    # Modify one input, into a temporary file when no output name is given.
+    # Return (input name, output name, error message or None)
+    name, options, input_name, output_name, encoding = task
+    try:
+        if output_name is None:
+            handle, output_name = tempfile.mkstemp(prefix='stringmod-')
+            os.close(handle)
+        else:
+            output_dir = os.path.dirname(output_name)
+            if output_dir and not os.path.isdir(output_dir):
+                try:
+                    os.makedirs(output_dir)
+                except OSError:
+                    # Made by another worker meanwhile
+                    if not os.path.isdir(output_dir):
+                        raise
+        output_file = _text_writer(open(output_name, 'wb'), encoding)
+        try:
+            modify_file(name, options, input_name, output_file, encoding)
+        finally:
+            output_file.close()
+    except (IOError, OSError, ValueError) as error:
+        # UnicodeError is a ValueError, as is text a reverse modifier can't
+        # parse
+        return input_name, output_name, str(error)
+    return input_name, output_name, None
+
+
+def _find_inputs(paths, include):
+    # Return (input name, name relative to its argument) of every file of
+    # paths, walking directories, in a stable order
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(fnmatch.filter(file_names, include)):
+                    input_name = os.path.join(dir_path, file_name)
+                    inputs.append((input_name, os.path.relpath(input_name, path)))
+        else:
+            inputs.append((path, os.path.basename(path)))
+    return inputs
+
+
+def _read_options(parser, args):
+    options = list(modifiers.default_options)
+    config_file_name = args.config
+    if config_file_name is None:
+        # The configuration of the plugin itself, if saved yet
+        config_file_name = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        config.CONFIG_FILE_NAME)
+        if not os.path.exists(config_file_name):
+            config_file_name = None
+    try:
+        if config_file_name:
+            config.read_config(config_file_name, options)
+        for entry in args.set or []:
+            params = config.split_entry(entry)
+            if len(params) != 2:
+                parser.error('--set expects NAME=VALUE, not %s' % entry)
+            config.set_option(options, params[0], params[1])
+    except IOError as error:
+        parser.error(str(error))
+    except KeyError as error:
+        parser.error('unknown option %s' % error.args[0])
+    except ValueError as error:
+        parser.error('invalid option value: %s' % error)
+    return options
+
+
+def _parse_args(parser, argv):
+    # Options may come between the modifier and the paths, as in
+    # MODIFIER --output-dir DIR PATH
+    if hasattr(parser, 'parse_intermixed_args'):
+        return parser.parse_intermixed_args(argv)
+
+    # Python < 3.7: the positional arguments after an option are left over
+    args, extra = parser.parse_known_args(argv)
+    unknown = [ arg for arg in extra if arg.startswith('-') and arg != '-' ]
+    if unknown:
+        parser.error('unrecognized arguments: %s' % ' '.join(unknown))
+    if args.modifier is None and extra:
+        args.modifier = extra.pop(0)
+    args.paths = args.paths + extra
+    return args
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stringmodifier',
+                                     description='Apply a String Modifier to the standard input, files or directories.')
+    parser.add_argument('modifier', nargs='?',
+                        help='modifier name, see --list')
+    parser.add_argument('paths', nargs='*', metavar='PATH',
+                        help='files or directories to modify (default: the standard input)')
+    parser.add_argument('--list', action='store_true',
+                        help='list the modifiers, pipelines, templates and options and exit')
+    parser.add_argument('-c', '--config', metavar='FILE',
+                        help='configuration file (default: the plugin\'s stringmod.cfg)')
+    parser.add_argument('-s', '--set', action='append', metavar='NAME=VALUE',
+                        help='set an option of the configuration file, may be repeated')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='write the results into FILE (default: the standard output)')
+    parser.add_argument('-d', '--output-dir', metavar='DIR',
+                        help='write the result of each file under DIR, at its relative path')
+    parser.add_argument('--suffix', default='',
+                        help='suffix added to the names of the files written under --output-dir')
+    parser.add_argument('--include', default='*', metavar='PATTERN',
+                        help='modify only the files of directories matching PATTERN (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='number of worker processes (default: %(default)s)')
+    parser.add_argument('--encoding', default='utf-8',
+                        help='encoding of the inputs and results (default: %(default)s)')
+    args = _parse_args(parser, argv)
+    options = _read_options(parser, args)
+
+    if args.list:
+        names = modifiers.names + [ name + modifiers.per_line_suffix
+                                    for name in modifiers.names ]
+        try:
+            names += [ modifiers.pipeline_prefix + name
+                       for name in modifiers.pipelines(options) ]
+            names += [ modifiers.template_prefix + name
+                       for name in modifiers.templates(options) ]
+        except re.error as error:
+            parser.error('invalid word pattern: %s' % error)
+        except ValueError as error:
+            parser.error('invalid pipeline or template: %s' % error)
+        for name in names:
+            sys.stdout.write('%s\n' % name)
+        sys.stdout.write('\n')
+        for index, name in enumerate(modifiers.option_names):
+            sys.stdout.write('%s=%s\n' % (name, options[index]))
+        return 0
+
+    if args.modifier is None:
+        parser.error('no modifier given, see --list')
+    if args.output and args.output_dir:
+        parser.error('--output and --output-dir exclude each other')
+    if args.output_dir and not args.paths:
+        parser.error('--output-dir needs files to modify')
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    try:
+        codecs.lookup(args.encoding)
+    except LookupError:
+        parser.error('unknown encoding %s' % args.encoding)
+
+    try:
+        modifiers.get_transform(args.modifier, options)
+    except KeyError:
+        parser.error('unknown modifier %s, see --list' % args.modifier)
+    except re.error as error:
+        parser.error('invalid word pattern: %s' % error)
+    except ValueError as error:
+        parser.error('invalid pipeline or template: %s' % error)
+
+    if args.output:
+        output_file = open(args.output, 'wb')
+    else:
+        output_file = getattr(sys.stdout, 'buffer', sys.stdout)
+
+    try:
+        if not args.paths:
+            input_file = _text_reader(getattr(sys.stdin, 'buffer', sys.stdin),
+                                      args.encoding)
+            writer = _text_writer(output_file, args.encoding)
+            status = 0
+            try:
+                for piece in iter_modify(args.modifier, options, input_file):
+                    writer.write(piece)
+            except ValueError as error:
+                sys.stderr.write('%s: %s\n' % (parser.prog, error))
+                status = 1
+            writer.flush()
+            if not _native_bytes:
+                # Keep the standard streams open
+                input_file.detach()
+                writer.detach()
+            return status
+
+        tasks = []
+        for input_name, relative_name in _find_inputs(args.paths, args.include):
+            output_name = None
+            if args.output_dir:
+                output_name = os.path.join(args.output_dir, relative_name + args.suffix)
+            tasks.append((args.modifier, options, input_name, output_name,
+                          args.encoding))
+
+        pool = None
+        if args.jobs > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(args.jobs, len(tasks)))
+            results = pool.imap(_run_task, tasks)
+        else:
+            results = (_run_task(task) for task in tasks)
+
+        status = 0
+        try:
+            # The results come in the order of the inputs
+            for input_name, output_name, error in results:
+                if error:
+                    sys.stderr.write('%s: %s: %s\n' % (parser.prog, input_name, error))
+                    status = 1
+                if args.output_dir is None:
+                    if not error:
+                        result_file = open(output_name, 'rb')
+                        try:
+                            shutil.copyfileobj(result_file, output_file)
+                        finally:
+                            result_file.close()
+                    if output_name and os.path.exists(output_name):
+                        os.remove(output_name)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        return status
+    finally:
+        if args.output:
+            output_file.close()
+        else:
+            output_file.flush()
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+#
+#  Benchmarks of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module measures how the modifiers scale with the size of the selection.
+The modifiers run on a FakeDocument, an in-memory stand-in for the part of
+the gedit Document API used by the plugin, through the same bufferops calls
+as the menu actions, so neither gtk nor gedit are needed:
+
+    python -m stringmodifier.bench [--sizes 1K,1M] [--modifiers Braces,...]
+                                   [--save FILE] [--compare FILE]
+
+Every modifier runs on a selection of synthetic text of each size, in a
+child process of its own. The time taken, the peak memory of that process
+(the selection included), the size of the document afterwards and the number
+of user actions (undo steps) are reported. Results saved with --save can be
+compared with a later run with --compare, which fails on slower results.
+The reverse modifiers run on the result of the modifier they reverse (see
+reverse_sources) on the synthetic text.
+
+Classes:
+FakeTextIter
+FakeTextMark
+FakeDocument
+
+Functions:
+make_text
+run_case
+main
+
+"""
+
+import sys
+import json
+import time
+import resource
+import argparse
+import traceback
+import multiprocessing
+
+try:
+    from queue import Empty
+except ImportError:
+    from Queue import Empty
+
+from . import bufferops
+from . import modifiers
+
+
+class FakeTextIter(object):
+    """
+    Position in a FakeDocument. Like a GtkTextIter it becomes invalid when
+    the document changes, unless it was passed to the change (insert and
+    delete revalidate their iters); using an invalid iter raises ValueError.
+
+    """
+
+    def __init__(self, doc, offset):
+        self._doc = doc
+        self._offset = offset
+        self._stamp = doc._stamp
+
+    def _check(self):
+        if self._stamp != self._doc._stamp:
+            raise ValueError('invalid text iter, the document was changed')
+
+    def _revalidate(self, offset):
+        self._offset = offset
+        self._stamp = self._doc._stamp
+
+    def get_offset(self):
+        self._check()
+        return self._offset
+
+    def copy(self):
+        self._check()
+        return FakeTextIter(self._doc, self._offset)
+
+
+class FakeTextMark(object):
+    """Mark of a FakeDocument, it follows the changes of the document."""
+
+    def __init__(self, name, offset, left_gravity):
+        self._name = name
+        self._offset = offset
+        self._left_gravity = left_gravity
+
+    def get_name(self):
+        return self._name
+
+    def get_left_gravity(self):
+        return self._left_gravity
+
+
+class FakeDocument(object):
+    """
+    In-memory stand-in for gedit.Document, providing the GtkTextBuffer
+    methods used by the plugin. The text is kept as a list of pieces so that
+    inserting in slices does not copy the whole text each time.
+
+    Offsets count the items of the text strings, i.e. bytes for utf-8
+    encoded strings; the synthetic text of the benchmarks is ASCII.
+
+    The number of completed (outermost) user actions is kept in user_actions.
+
+    """
+
+    def __init__(self, text=''):
+        self._pieces = [ text ] if text else []
+        self._length = len(text)
+        self._stamp = 0
+        self._marks = []
+        self._named_marks = {}
+        self._user_action_depth = 0
+        self.user_actions = 0
+
+        start_iter = self.get_start_iter()
+        self.create_mark('insert', start_iter)
+        self.create_mark('selection_bound', start_iter)
+
+    def _locate(self, offset):
+        # Return the index of the piece starting at offset, splitting the
+        # piece holding offset if needed
+        if offset == self._length:
+            return len(self._pieces)
+        position = 0
+        for index, piece in enumerate(self._pieces):
+            if position == offset:
+                return index
+            if offset < position + len(piece):
+                split = offset - position
+                self._pieces[index:index + 1] = [ piece[:split], piece[split:] ]
+                return index + 1
+            position += len(piece)
+        raise ValueError('offset %d out of the document' % offset)
+
+    def _changed(self):
+        self._stamp += 1
+
+    # Text
+    def get_char_count(self):
+        return self._length
+
+    def get_text(self, start, end, include_hidden_chars=True):
+        start_offset, end_offset = sorted((start.get_offset(), end.get_offset()))
+        return ''.join(self._pieces[self._locate(start_offset):self._locate(end_offset)])
+
+    def insert(self, where, text):
+        offset = where.get_offset()
+        if text:
+            index = self._locate(offset)
+            self._pieces.insert(index, text)
+            self._length += len(text)
+            for mark in self._marks:
+                if mark._offset > offset or (mark._offset == offset and
+                                             not mark._left_gravity):
+                    mark._offset += len(text)
+            self._changed()
+        where._revalidate(offset + len(text))
+
+    def delete(self, start, end):
+        start_offset, end_offset = sorted((start.get_offset(), end.get_offset()))
+        if start_offset < end_offset:
+            start_index = self._locate(start_offset)
+            end_index = self._locate(end_offset)
+            del self._pieces[start_index:end_index]
+            self._length -= end_offset - start_offset
+            for mark in self._marks:
+                if mark._offset >= end_offset:
+                    mark._offset -= end_offset - start_offset
+                elif mark._offset > start_offset:
+                    mark._offset = start_offset
+            self._changed()
+        start._revalidate(start_offset)
+        end._revalidate(start_offset)
+
+    # Iters
+    def get_iter_at_offset(self, offset):
+        if offset < 0 or offset > self._length:
+            offset = self._length
+        return FakeTextIter(self, offset)
+
+    def get_start_iter(self):
+        return FakeTextIter(self, 0)
+
+    def get_end_iter(self):
+        return FakeTextIter(self, self._length)
+
+    def get_bounds(self):
+        return self.get_start_iter(), self.get_end_iter()
+
+    # Marks
+    def create_mark(self, mark_name, where, left_gravity=False):
+        mark = FakeTextMark(mark_name, where.get_offset(), left_gravity)
+        self._marks.append(mark)
+        if mark_name:
+            self._named_marks[mark_name] = mark
+        return mark
+
+    def delete_mark(self, mark):
+        self._marks.remove(mark)
+        if mark.get_name():
+            del self._named_marks[mark.get_name()]
+
+    def get_mark(self, name):
+        return self._named_marks.get(name)
+
+    def get_insert(self):
+        return self._named_marks['insert']
+
+    def get_selection_bound(self):
+        return self._named_marks['selection_bound']
+
+    def get_iter_at_mark(self, mark):
+        return FakeTextIter(self, mark._offset)
+
+    def move_mark(self, mark, where):
+        mark._offset = where.get_offset()
+
+    def move_mark_by_name(self, name, where):
+        self.move_mark(self._named_marks[name], where)
+
+    # Selection
+    def select_range(self, ins, bound):
+        self.move_mark(self.get_insert(), ins)
+        self.move_mark(self.get_selection_bound(), bound)
+
+    def get_has_selection(self):
+        return self.get_insert()._offset != self.get_selection_bound()._offset
+
+    def get_selection_bounds(self):
+        if not self.get_has_selection():
+            return ()
+        return tuple(sorted((self.get_iter_at_mark(self.get_insert()),
+                             self.get_iter_at_mark(self.get_selection_bound())),
+                            key=lambda text_iter: text_iter._offset))
+
+    # Undo grouping
+    def begin_user_action(self):
+        self._user_action_depth += 1
+
+    def end_user_action(self):
+        self._user_action_depth -= 1
+        if self._user_action_depth == 0:
+            self.user_actions += 1
+
+
+# Sizes of the selections, in bytes
+DEFAULT_SIZES = '1K,10K,100K,1M,10M,100M'
+
+# Seconds between the checks that a benchmark process is still running
+POLL_INTERVAL = 1.0
+
+_sample = 'lorem ipsum dolor, sit amet;\tconsectetur adipiscing elit\n'
+
+# Modifiers making the selections of the reverse modifiers
+reverse_sources = { 'Array2Str': 'Str2CharArray',
+                    'StripEnclosure': 'Braces' }
+
+
+def make_text(size):
+    """Return size characters of synthetic text of words and lines."""
+    return (_sample * (size // len(_sample) + 1))[:size]
+
+
+def _parse_size(size):
+    units = { 'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024 }
+    size = size.strip().upper()
+    if size[-1:] in units:
+        return int(size[:-1]) * units[size[-1]]
+    return int(size)
+
+
+def _peak_memory():
+    # Peak resident memory of the process in bytes, ru_maxrss is counted in
+    # kilobytes on Linux and in bytes on Mac OS X
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+def run_case(name, size, options):
+    """
+    Run the modifier name on a selection of size characters, the whole text
+    of a FakeDocument, the same way the plugin's menu actions do. Return a
+    dict of the measurements.
+
+    Selections handed to a worker thread by the plugin are measured here as
+    streamed replacements, which is what the thread is followed by.
+
+    """
+    text = make_text(size)
+    if modifiers.is_reverse(name):
+        source = modifiers.per_line_base(name) or name
+        text = modifiers.apply(name.replace(source, reverse_sources[source]),
+                               options, text)
+    doc = FakeDocument(text)
+    start_iter, end_iter = doc.get_bounds()
+    doc.select_range(end_iter, start_iter)
+
+    started = time.time()
+    symbols = modifiers.enclosure(name, options)
+    if symbols:
+        bufferops.enclose_selection(doc, symbols[0], symbols[1])
+    else:
+        selected_text, start_iter, end_iter = bufferops.get_selection(doc)
+        transform = modifiers.get_transform(name, options)
+        if len(selected_text) < bufferops.STREAM_THRESHOLD:
+            bufferops.replace_range(doc, start_iter, end_iter,
+                                    ''.join(transform(selected_text)))
+        else:
+            for unused in bufferops.iter_replace(doc, start_iter, end_iter,
+                                                 transform(selected_text)):
+                pass
+    seconds = time.time() - started
+
+    return dict(modifier=name, size=size, seconds=seconds,
+                peak_memory=_peak_memory(), output_size=doc.get_char_count(),
+                user_actions=doc.user_actions)
+
+
+def _run_case_in_child(queue, name, size, options):
+    try:
+        queue.put(run_case(name, size, options))
+    except Exception:
+        queue.put(traceback.format_exc())
+
+
+def _run_isolated(name, size, options):
+    # Run the case in a child process, so that its peak memory is its own
+    queue = multiprocessing.Queue()
+    child = multiprocessing.Process(target=_run_case_in_child,
+                                    args=(queue, name, size, options))
+    child.start()
+    # The child may die without a result, e.g. killed when out of memory
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=POLL_INTERVAL)
+        except Empty:
+            if not child.is_alive():
+                try:
+                    # Put just before the child ended
+                    result = queue.get(timeout=POLL_INTERVAL)
+                except Empty:
+                    child.join()
+                    raise RuntimeError('%s on %d characters failed: the benchmark '
+                                       'process ended with exit code %s' %
+                                       (name, size, child.exitcode))
+    child.join()
+    if not isinstance(result, dict):
+        raise RuntimeError('%s on %d characters failed:\n%s' % (name, size, result))
+    return result
+
+
+def _format_size(size):
+    for unit, factor in (('G', 1 << 30), ('M', 1 << 20), ('K', 1 << 10)):
+        if size >= factor:
+            return '%.1f%s' % (size / float(factor), unit)
+    return '%d' % size
+
+
+def _compare(results, baseline, tolerance):
+    # Return the results slower than their baseline by more than tolerance
+    # (a fraction), ignoring differences below a millisecond
+    base = dict(((result['modifier'], result['size']), result['seconds'])
+                for result in baseline)
+    slower = []
+    for result in results:
+        seconds = base.get((result['modifier'], result['size']))
+        if seconds is None:
+            continue
+        if (result['seconds'] > seconds * (1 + tolerance) and
+            result['seconds'] - seconds > 0.001):
+            slower.append((result, seconds))
+    return slower
+
+
+def main(argv=None):
+    all_names = modifiers.names + [ name + modifiers.per_line_suffix
+                                    for name in modifiers.names ]
+
+    parser = argparse.ArgumentParser(prog='python -m stringmodifier.bench',
+                                     description='Measure the String Modifiers on synthetic selections.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='comma separated selection sizes, K and M suffixes allowed (default: %(default)s)')
+    parser.add_argument('--modifiers', default=','.join(all_names),
+                        help='comma separated modifier names (default: all)')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as JSON into FILE')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with results saved before, exit with status 1 when slower')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='fraction by which a result may be slower than the saved one (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    names = [ name.strip() for name in args.modifiers.split(',') if name.strip() ]
+    for name in names:
+        if name not in all_names:
+            parser.error('unknown modifier %s' % name)
+    sizes = [ _parse_size(size) for size in args.sizes.split(',') if size.strip() ]
+    options = list(modifiers.default_options)
+
+    sys.stdout.write('%-24s %8s %10s %10s %10s %5s\n' %
+                     ('modifier', 'size', 'seconds', 'memory', 'output', 'undo'))
+    results = []
+    for name in names:
+        for size in sizes:
+            result = _run_isolated(name, size, options)
+            results.append(result)
+            sys.stdout.write('%-24s %8s %10.4f %10s %10s %5d\n' %
+                             (name, _format_size(size), result['seconds'],
+                              _format_size(result['peak_memory']),
+                              _format_size(result['output_size']),
+                              result['user_actions']))
+            sys.stdout.flush()
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump(results, results_file, indent=1)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            slower = _compare(results, json.load(baseline_file), args.tolerance)
+        for result, seconds in slower:
+            sys.stdout.write('SLOWER: %s on %s took %.4fs instead of %.4fs\n' %
+                             (result['modifier'], _format_size(result['size']),
+                              result['seconds'], seconds))
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#
+#  Buffer operations of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2010, Hertatijanto Hartono <dvertx@gmail.com>
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module provides edit operations on a gedit document. They only use the
+document's own methods and do not import gtk, so any object providing the same
+GtkTextBuffer methods can be used in place of a gedit document.
+
+Functions:
+get_selection
+replace_range
+enclose_selection
+replace_ranges
+iter_insert
+iter_replace
+
+"""
+
+# Replacements made from a selection of at least this many characters should
+# be inserted in slices, see iter_replace
+STREAM_THRESHOLD = 64 * 1024
+
+
+def get_selection(doc):
+    """
+    Return (selected text, start iter, end iter) of doc, ('', None, None)
+    when nothing is selected.
+
+    """
+    if not doc.get_has_selection():
+        return '', None, None
+
+    start_iter, end_iter = doc.get_selection_bounds()
+    return doc.get_text(start_iter, end_iter), start_iter, end_iter
+
+
+def replace_range(doc, start_iter, end_iter, text):
+    """
+    Replace the text between start_iter and end_iter by text, as a single
+    user action, and select the new text.
+
+    """
+    doc.begin_user_action()
+
+    # Delete selected text
+    doc.delete(start_iter, end_iter)
+
+    # Mark start of new selection
+    start_mark = doc.create_mark(
+        mark_name=None,
+        where=start_iter,
+        left_gravity=True)
+
+    # Insert the new text
+    doc.insert(start_iter, text)
+
+    # Move the selection bound to the new text
+    new_start_iter = doc.get_iter_at_mark(start_mark)
+    doc.move_mark_by_name("selection_bound", new_start_iter)
+    doc.delete_mark(start_mark)
+
+    doc.end_user_action()
+
+
+def enclose_selection(doc, opening_symbol, closing_symbol):
+    """
+    Enclose the selected text of doc by inserting only the opening and closing
+    symbols at the selection bounds. The selected text itself is neither read
+    nor rewritten, so the cost depends on the length of the symbols only.
+
+    The enclosed text, symbols included, is selected afterwards.
+
+    """
+    if not doc.get_has_selection():
+        return
+
+    start_iter, end_iter = doc.get_selection_bounds()
+
+    doc.begin_user_action()
+
+    # The start mark stays in front of the opening symbol and the end mark
+    # moves past the closing symbol when they are inserted
+    start_mark = doc.create_mark(
+        mark_name=None,
+        where=start_iter,
+        left_gravity=True)
+    end_mark = doc.create_mark(
+        mark_name=None,
+        where=end_iter,
+        left_gravity=False)
+
+    doc.insert(end_iter, closing_symbol)
+    doc.insert(doc.get_iter_at_mark(start_mark), opening_symbol)
+
+    # Select the enclosed text, with the cursor at its end
+    doc.select_range(doc.get_iter_at_mark(end_mark),
+                     doc.get_iter_at_mark(start_mark))
+
+    doc.delete_mark(start_mark)
+    doc.delete_mark(end_mark)
+
+    doc.end_user_action()
+
+
+def replace_ranges(doc, replacements):
+    """
+    Replace ranges of doc's text as a single user action. replacements is a
+    list of (start offset, end offset, new text) tuples in document order,
+    e.g. from engine.find_replacements. They are applied from the last to
+    the first, so the offsets of the ranges still to replace stay valid.
+
+    """
+    doc.begin_user_action()
+
+    for start, end, text in reversed(replacements):
+        start_iter = doc.get_iter_at_offset(start)
+        doc.delete(start_iter, doc.get_iter_at_offset(end))
+        doc.insert(start_iter, text)
+
+    doc.end_user_action()
+
+
+# Maximum length of a string passed to a single doc.insert by iter_insert
+INSERT_SLICE_SIZE = 32768
+
+
+def _slices(chunks, slice_size):
+    # Cut chunks into strings of at most slice_size, never in the middle of
+    # an utf-8 encoded character
+    for chunk in chunks:
+        start = 0
+        length = len(chunk)
+        while start < length:
+            end = start + slice_size
+            if end < length and isinstance(chunk, bytes):
+                while end > start and ord(chunk[end:end + 1]) & 0xC0 == 0x80:
+                    end -= 1
+                if end == start:
+                    # Slice too short for this character, take it whole
+                    end = start + 1
+                    while end < length and ord(chunk[end:end + 1]) & 0xC0 == 0x80:
+                        end += 1
+            yield chunk[start:end]
+            start = end
+
+
+def iter_insert(doc, where_mark, chunks, slice_size=INSERT_SLICE_SIZE):
+    """
+    Insert the strings of chunks into doc at where_mark, a mark with right
+    gravity, in slices of at most slice_size characters.
+
+    This is a generator yielding after each slice, so the caller can return
+    to the main loop (and let the view repaint) between two slices. chunks
+    may be a generator too, e.g. one of the engine's iter_* functions, which
+    is then only advanced as far as needed for the next slice.
+
+    """
+    for piece in _slices(chunks, slice_size):
+        doc.insert(doc.get_iter_at_mark(where_mark), piece)
+        yield
+
+
+def iter_replace(doc, start_iter, end_iter, chunks, slice_size=INSERT_SLICE_SIZE):
+    """
+    Replace the text between start_iter and end_iter by the strings of
+    chunks, like replace_range, inserting them with iter_insert. This is a
+    generator yielding after each slice; the replacement is a single user
+    action, which is closed when the generator ends, fails or is closed.
+
+    chunks may fail half way, e.g. a transformation raising ValueError for
+    a line it can't modify: the replaced text is then put back and selected
+    again before the error is raised.
+
+    """
+    doc.begin_user_action()
+    try:
+        text = doc.get_text(start_iter, end_iter)
+        doc.delete(start_iter, end_iter)
+        start_mark = doc.create_mark(
+            mark_name=None,
+            where=start_iter,
+            left_gravity=True)
+        end_mark = doc.create_mark(
+            mark_name=None,
+            where=start_iter,
+            left_gravity=False)
+        try:
+            try:
+                for unused in iter_insert(doc, end_mark, chunks, slice_size):
+                    yield
+            except Exception:
+                # Put the replaced text back in place of the inserted slices
+                doc.delete(doc.get_iter_at_mark(start_mark),
+                           doc.get_iter_at_mark(end_mark))
+                doc.insert(doc.get_iter_at_mark(start_mark), text)
+                doc.select_range(doc.get_iter_at_mark(end_mark),
+                                 doc.get_iter_at_mark(start_mark))
+                raise
+
+            # Select the new text
+            doc.select_range(doc.get_iter_at_mark(end_mark),
+                             doc.get_iter_at_mark(start_mark))
+        finally:
+            doc.delete_mark(start_mark)
+            doc.delete_mark(end_mark)
+    finally:
+        doc.end_user_action()
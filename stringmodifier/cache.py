@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+#  Result cache of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module keeps the results of the latest modifications, so that applying
+a modifier again to the same text, e.g. after an undo, does not transform
+the text again. It does not depend on gtk.
+
+Results are found by a key made of the modifier name, the options and a
+digest of the modified text. The least recently used results are dropped
+when the results take more memory than the budget of the cache.
+
+Classes:
+ResultCache
+
+Functions:
+make_key
+
+"""
+
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def make_key(name, options, text):
+    """
+    Return the cache key of the result of the modifier name for text, as
+    set up by options, a tuple of the options the result depends on (see
+    modifiers.result_options).
+
+    """
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8', 'surrogatepass')
+    return (name, options, len(text), hashlib.sha1(text).hexdigest())
+
+
+class ResultCache(object):
+    """
+    Least recently used results of modifications, by key (see make_key),
+    holding at most budget bytes of results. A budget of 0 turns the cache
+    off. The numbers of hits and misses are counted since the cache was
+    made or cleared.
+
+    The cache may be used from worker threads.
+
+    """
+
+    def __init__(self, budget):
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self):
+        # Drop the least recently used results until they fit the budget
+        while self._results and self.size > self.budget:
+            unused, result = self._results.popitem(last=False)
+            self.size -= sys.getsizeof(result)
+
+    def set_budget(self, budget):
+        """Change the budget, dropping results that don't fit anymore."""
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def get(self, key):
+        """Return the result of key, None if it is not cached."""
+        with self._lock:
+            result = self._results.pop(key, None)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results[key] = result
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """
+        Keep result as the result of key, unless it is larger than the
+        budget on its own.
+
+        """
+        size = sys.getsizeof(result)
+        with self._lock:
+            old_result = self._results.pop(key, None)
+            if old_result is not None:
+                self.size -= sys.getsizeof(old_result)
+            if size > self.budget:
+                return
+            self._results[key] = result
+            self.size += size
+            self._evict()
+
+    def iter_put(self, key, pieces):
+        """
+        Yield the pieces of a result, keeping the whole result as the result
+        of key once they are all used.
+
+        """
+        kept = []
+        for piece in pieces:
+            kept.append(piece)
+            yield piece
+        self.put(key, ''.join(kept))
+
+    def clear(self):
+        """Drop all results and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
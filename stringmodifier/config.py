@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+#  Configuration file of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2010, Hertatijanto Hartono <dvertx@gmail.com>
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module reads and writes stringmod.cfg, the configuration file of the
+plugin, into and from the options list laid out by modifiers.option_names.
+It does not depend on gtk, so the configuration can be shared with the
+command line (see the batch module).
+
+The plugin keeps its options in a ConfigStore, shared by all its windows,
+which tells them about changes of the options.
+
+Classes:
+ConfigStore
+
+Functions:
+split_entry
+set_option
+parse_config
+read_config
+write_config
+
+"""
+
+import os
+import re
+import tempfile
+
+from . import modifiers
+
+# Name of the configuration file, in the plugin directory
+CONFIG_FILE_NAME = 'stringmod.cfg'
+
+
+def split_entry(line):
+    """Return [name, value] of a 'name=value' line, [line] without '='."""
+    newstr = re.sub(r'\s$', '', line)
+    return re.split('=', newstr, 1)
+
+
+def set_option(options, name, value):
+    """
+    Set the option name in options to the string value, converted to the
+    type of its default value. KeyError is raised for unknown names and
+    ValueError for values that can't be converted.
+
+    """
+    index = modifiers.option_index[name]
+    options[index] = type(modifiers.default_options[index])(value)
+
+
+def parse_config(lines, options=None):
+    """
+    Set the entries of the configuration lines into options, a copy of
+    modifiers.default_options if not given, and return it. Lines which are
+    not entries of a known option are ignored; entries missing from lines
+    keep the value they have in options.
+
+    """
+    if options is None:
+        options = list(modifiers.default_options)
+    for line in lines:
+        params = split_entry(line)
+        if len(params) == 2 and params[0] in modifiers.option_names:
+            set_option(options, params[0], params[1])
+    return options
+
+
+def read_config(file_name, options=None):
+    """Like parse_config, for the lines of the file file_name."""
+    config_file = open(file_name)
+    try:
+        return parse_config(config_file, options)
+    finally:
+        config_file.close()
+
+
+def write_config(file_name, options):
+    """
+    Write options into the configuration file file_name. The file is
+    replaced at once by a complete new file, so that other processes never
+    read a file written in part.
+
+    """
+    handle, temp_name = tempfile.mkstemp(prefix='.' + os.path.basename(file_name),
+                                         dir=os.path.dirname(os.path.abspath(file_name)))
+    try:
+        config_file = os.fdopen(handle, 'w')
+        try:
+            for index, name in enumerate(modifiers.option_names):
+                config_file.write("%s=%s\n" % (name, options[index]))
+        finally:
+            config_file.close()
+        if os.path.exists(file_name):
+            os.chmod(temp_name, os.stat(file_name).st_mode & 0o777)
+        else:
+            os.chmod(temp_name, 0o644)
+        os.rename(temp_name, file_name)
+    except:
+        os.remove(temp_name)
+        raise
+
+
+class ConfigStore(object):
+    """
+    The options of the plugin, read from and written to the configuration
+    file file_name. Every option is an attribute named after its entry,
+    e.g. store.WrapColumn, holding a value of the type of its default value.
+    store.options holds the same values in the options list laid out by
+    modifiers.option_names; the list is updated in place, so references to
+    it stay valid.
+
+    Functions subscribed with subscribe are called as callback(store,
+    changed) after options were changed, changed being the list of the names
+    of the options.
+
+    """
+
+    def __init__(self, file_name=None):
+        self.file_name = file_name
+        self.options = list(modifiers.default_options)
+        self._subscribers = []
+        self._mtime = None
+        self._set_attributes()
+
+    def _set_attributes(self):
+        for name, value in zip(modifiers.option_names, self.options):
+            setattr(self, name, value)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def set_options(self, options):
+        """
+        Set the options to the values of options, a list laid out like
+        store.options, converted to the types of their default values.
+        Return the names of the options which changed, after the subscribers
+        were told about them. ValueError is raised for values that can't be
+        converted, before any option is set.
+
+        """
+        values = [ type(default)(value)
+                   for default, value in zip(modifiers.default_options, options) ]
+        changed = [ name for name, old_value, value
+                    in zip(modifiers.option_names, self.options, values)
+                    if old_value != value ]
+        if changed:
+            self.options[:] = values
+            self._set_attributes()
+            for callback in list(self._subscribers):
+                callback(self, changed)
+        return changed
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.file_name).st_mtime
+        except OSError:
+            return None
+
+    def load(self):
+        """
+        Read the options from the configuration file, unless it is missing
+        or was not modified since the store last read or wrote it, e.g. by
+        another gedit process. Return the names of the options which
+        changed. Entries missing from the file keep their value.
+
+        """
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self._mtime:
+            return []
+        options = read_config(self.file_name, list(self.options))
+        self._mtime = mtime
+        return self.set_options(options)
+
+    def save(self):
+        """Write the options into the configuration file."""
+        write_config(self.file_name, self.options)
+        self._mtime = self._file_mtime()
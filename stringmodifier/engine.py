@@ -0,0 +1,860 @@
+# -*- coding: utf-8 -*-
+#
+#  Transformation engine of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2010, Hertatijanto Hartono <dvertx@gmail.com>
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module provides the text transformations used by the modifiers. It does
+not depend on gtk or gedit, so it can be imported and used on its own.
+
+Every transformation builds its result with str.join over a list instead of
+repeated string concatenation, so the cost grows linearly with the size of
+the selection.
+
+The array transformations are also available as generators (iter_*), which
+yield the result in pieces of about CHUNK_SIZE elements and can report their
+progress, so that a caller can spread the work or stop it half way.
+
+Arrays can be wrapped over several lines (see Wrap). Lines are broken while
+the array is built, so wrapping does not need another pass over the result.
+
+Quoted elements and text can be escaped for the string literals of a
+language (see get_escape). The escapes are precomputed tables applied by
+str.translate, or by map over the characters for char arrays, so no Python
+code runs per character.
+
+Word arrays can drop repeated words, be sorted and count the words. Each of
+these is a single pass over the words through a dict or a set, or a single
+sort, so they stay linear (or n log n) in the number of words.
+
+Char arrays are made of the characters (code points) or of the grapheme
+clusters of the decoded text, utf-8 encoded text (as gedit hands it to a
+Python 2 plugin) is decoded first. Pure ASCII text, where both are the
+bytes, is formatted as it is without decoding or splitting.
+
+Byte arrays format whole blocks of bytes at once: the bytes are converted to
+integers by array.array and formatted by map with a precomputed format, no
+Python code runs per byte. Files are read through a memory map.
+
+Classes:
+Wrap
+
+Functions:
+iter_enclose
+find_replacements
+split_words
+split_chars
+get_tokenizer
+get_escape_table
+get_escape
+split_graphemes
+char_array
+word_array
+byte_array
+iter_char_array
+iter_word_array
+iter_byte_array
+iter_file_byte_array
+iter_per_line
+format_array
+
+"""
+
+import os
+import re
+import sys
+import csv
+import mmap
+import operator
+import unicodedata
+from array import array
+from collections import namedtuple, Counter
+
+# Separators between words of a word array
+_word_separators = re.compile(r'[\s,;]+')
+
+# Characters of utf-8 encoded text, with their continuation bytes; stray
+# bytes of invalid text are characters of their own
+_utf8_char = re.compile(b'[\xc0-\xff][\x80-\xbf]*|[\x00-\xff]')
+
+# Identifiers, for the 'identifiers' tokenizer
+_identifier = re.compile(r'\b[^\W\d]\w*', re.UNICODE)
+
+# Word tokenizers, in the order of the configuration dialog
+TOKENIZERS = ('separators', 'whitespace', 'csv', 'identifiers', 'custom')
+
+# Escaping of string literals, in the order of the configuration dialog
+ESCAPES = ('none', 'c', 'python', 'javascript', 'java', 'go')
+
+# Escapes of control characters by letter, and the format of the escape of
+# the other control characters, by language
+_letter_escapes = { 'c': 'abfnrtv', 'python': 'abfnrtv', 'javascript': 'bfnrt',
+                    'java': 'bfnrt', 'go': 'abfnrtv' }
+
+_code_escapes = { 'c': '\\%03o', 'python': '\\x%02x', 'javascript': '\\u%04x',
+                  'java': '\\%03o', 'go': '\\x%02x' }
+
+_letter_chars = { 'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r',
+                  't': '\t', 'v': '\v' }
+
+# Orders of the words of word arrays, in the order of the configuration
+# dialog
+WORD_SORTS = ('none', 'lexical', 'caseless', 'natural', 'frequency')
+
+# Runs of digits, compared as numbers by the natural order
+_digits = re.compile(r'(\d+)')
+
+# Elements of char arrays, in the order of the configuration dialog
+CHAR_UNITS = ('codepoints', 'graphemes')
+
+# Grapheme clusters, see split_graphemes; made on first use
+_grapheme = None
+
+# Escape tables and functions already set up, by (mode, quote)
+_escape_tables = {}
+_escape_functions = {}
+
+# Tokenizers already set up, by (mode, pattern)
+_tokenizers = {}
+
+
+def iter_enclose(text, opening_symbol, closing_symbol, progress=None,
+                 escape='none'):
+    """
+    Return an iterator over the pieces of text enclosed by the opening and
+    closing symbols. escape, one of ESCAPES, escapes text for a string
+    literal quoted by closing_symbol.
+
+    """
+    escape_text = get_escape(escape, closing_symbol)
+    yield opening_symbol
+    yield escape_text(text) if escape_text else text
+    yield closing_symbol
+    if progress:
+        progress(1.0)
+
+
+def find_replacements(text, pattern, modify):
+    """
+    Return a list of (start, end, replacement) tuples, replacement being
+    modify(matched text), for every non empty match of the compiled regular
+    expression pattern in text. text is scanned once, from start to end.
+
+    """
+    return [ (match.start(), match.end(), modify(match.group()))
+             for match in pattern.finditer(text) if match.end() > match.start() ]
+
+
+def split_words(text):
+    """Split text into a list of words, ignoring leading/trailing spaces."""
+    return _word_separators.split(text.strip())
+
+
+def split_chars(text):
+    """
+    Return the characters (code points) of text, a sequence of them.
+    utf-8 encoded text, as gedit hands it to a Python 2 plugin, is split
+    into the utf-8 bytes of each character, not into single bytes.
+
+    """
+    if isinstance(text, bytes) and not _is_ascii(text):
+        return _utf8_char.findall(text)
+    return text
+
+
+def _split_whitespace(text):
+    return text.split()
+
+
+def _split_csv(text):
+    # Fields of comma separated values, a quoted field may hold commas. A
+    # field may be as long as the whole text, the limit of the csv module
+    # (128K by default) is raised as needed.
+    if len(text) > csv.field_size_limit():
+        csv.field_size_limit(len(text))
+    try:
+        return [ field.strip()
+                 for row in csv.reader(text.splitlines(), skipinitialspace=True)
+                 for field in row if field.strip() ]
+    except csv.Error as error:
+        raise ValueError('invalid comma separated values: %s' % error)
+
+
+def _decoding(tokenizer):
+    # Regular expressions of words only match whole characters of decoded
+    # text: utf-8 encoded text is decoded first and its words encoded back
+    def tokenize(text):
+        if isinstance(text, bytes) and not _is_ascii(text):
+            return [ word.encode('utf-8')
+                     for word in tokenizer(text.decode('utf-8')) ]
+        return tokenizer(text)
+    return tokenize
+
+
+def get_tokenizer(mode='separators', pattern=None):
+    """
+    Return a function splitting a text into the list of its words.
+
+    mode is one of TOKENIZERS:
+      separators  -- words separated by spaces, commas or semicolons
+      whitespace  -- words separated by spaces, without regular expression
+      csv         -- comma separated values, quotes respected
+      identifiers -- the identifiers in the text, anything else is ignored
+      custom      -- words separated by matches of the regular expression
+                     pattern
+
+    Tokenizers are set up once per mode and pattern and reused afterwards.
+    An invalid pattern raises re.error. The identifiers and custom
+    tokenizers decode utf-8 encoded text and encode its words back, so that
+    their patterns match whole characters.
+
+    """
+    key = (mode, pattern if mode == 'custom' else None)
+    try:
+        return _tokenizers[key]
+    except KeyError:
+        pass
+
+    if mode == 'separators':
+        tokenizer = split_words
+    elif mode == 'whitespace':
+        tokenizer = _split_whitespace
+    elif mode == 'csv':
+        tokenizer = _split_csv
+    elif mode == 'identifiers':
+        tokenizer = _decoding(_identifier.findall)
+    elif mode == 'custom':
+        separators = re.compile(pattern, re.UNICODE)
+        def split(text):
+            return list(filter(None, separators.split(text)))
+        tokenizer = _decoding(split)
+    else:
+        raise ValueError('unknown tokenizer %r' % mode)
+
+    _tokenizers[key] = tokenizer
+    return tokenizer
+
+
+def get_escape_table(mode, quote):
+    """
+    Return a dictionary of the escapes of the characters to escape in a
+    string literal of the language mode (one of ESCAPES) quoted by quote, by
+    character, None for mode 'none'. Backslashes, the quote and control
+    characters are escaped.
+
+    """
+    key = (mode, quote)
+    try:
+        return _escape_tables[key]
+    except KeyError:
+        pass
+
+    if mode == 'none':
+        table = None
+    elif mode in _letter_escapes:
+        table = dict((chr(code), _code_escapes[mode] % code)
+                     for code in list(range(0x20)) + [ 0x7f ])
+        for letter in _letter_escapes[mode]:
+            table[_letter_chars[letter]] = '\\' + letter
+        table['\\'] = '\\\\'
+        table[quote] = '\\' + quote
+        if mode == 'javascript':
+            # Line ends of JavaScript, though not of JSON. Python 2 text is
+            # utf-8 encoded, or decoded for char arrays, so both are escaped.
+            for code in (0x2028, 0x2029):
+                table[_unichr(code)] = '\\u%04x' % code
+                if sys.version_info[0] < 3:
+                    table[_unichr(code).encode('utf-8')] = '\\u%04x' % code
+    else:
+        raise ValueError('unknown escaping %r' % mode)
+
+    _escape_tables[key] = table
+    return table
+
+
+def _special_pattern(chars):
+    # Regular expression matching the strings of chars: a set of the single
+    # characters, or one of the longer strings (utf-8 encoded characters)
+    longer = [ re.escape(char) for char in chars if len(char) > 1 ]
+    single = ''.join(re.escape(char) for char in chars if len(char) == 1)
+    return re.compile('|'.join([ '[%s]' % single ] + longer))
+
+
+def get_escape(mode, quote):
+    """
+    Return a function escaping a text for a string literal of the language
+    mode quoted by quote, see get_escape_table, None for mode 'none'.
+
+    """
+    key = (mode, quote)
+    try:
+        return _escape_functions[key]
+    except KeyError:
+        pass
+
+    table = get_escape_table(mode, quote)
+    if table is None:
+        escape = None
+    elif sys.version_info[0] >= 3:
+        escape = operator.methodcaller('translate', str.maketrans(table))
+    else:
+        # Python 2 text is an utf-8 encoded str, whose translate can't make a
+        # character longer; only the characters to escape call back.
+        # Decoded text, e.g. grapheme clusters, has a pattern of its own.
+        special = _special_pattern([ char for char in table
+                                     if isinstance(char, bytes) ])
+        special_unicode = _special_pattern([ char for char in table
+                                             if len(char) == 1 ])
+        def escape(text):
+            pattern = special if isinstance(text, bytes) else special_unicode
+            return pattern.sub(lambda match: table[match.group()], text)
+
+    _escape_functions[key] = escape
+    return escape
+
+
+# Number of elements converted per yielded piece
+CHUNK_SIZE = 65536
+
+# Wrapping of array lines:
+#   column -- maximum length of a line, 0 for no limit
+#   count  -- maximum number of elements on a line, 0 for no limit
+#   indent -- number of spaces in front of each line of elements
+Wrap = namedtuple('Wrap', 'column count indent')
+
+
+def _chunks(elements, chunk_size):
+    # Yield (chunk of elements, fraction done) pairs
+    total = len(elements)
+    for pos in range(0, total, chunk_size):
+        yield elements[pos:pos + chunk_size], min(pos + chunk_size, total) / float(total)
+
+
+def _iter_array(chunks, encl, quote, progress):
+    # Yield the array of the quoted elements of chunks, one piece per chunk
+    glue = quote + ', ' + quote
+    separator = quote
+    yield encl[0] + ' '
+    for elements, done in chunks:
+        if elements:
+            yield separator + glue.join(elements) + quote
+            separator = ', ' + quote
+        if progress:
+            progress(done)
+    yield ' ' + encl[1]
+
+
+def _elements_per_line(wrap, width):
+    # Number of elements of the given width (quotes included) fitting on a
+    # line: indent + n * width + (n - 1) * len(', ') + len(',') <= column
+    per_line = wrap.count or None
+    if wrap.column:
+        fitting = max(1, (wrap.column - wrap.indent + 1) // (width + 2))
+        per_line = min(per_line or fitting, fitting)
+    return per_line
+
+
+def _iter_wrapped_array(chunks, encl, quote, wrap, width, progress):
+    # Yield the array of the quoted elements of chunks, wrapped over several
+    # lines. When all elements have the same width, every line holds the
+    # same number of elements and lines are built by slicing; otherwise each
+    # line is filled with as many elements as fit in it.
+    glue = quote + ', ' + quote
+    line_start = '\n' + ' ' * wrap.indent
+    line_break = ',' + line_start
+
+    yield encl[0]
+
+    per_line = _elements_per_line(wrap, width) if width else None
+    if per_line:
+        # Number of elements on the current line, carried over chunks
+        line_count = 0
+        for elements, done in chunks:
+            pieces = []
+            pos = 0
+            total = len(elements)
+            if 0 < line_count < per_line and total:
+                pos = min(total, per_line - line_count)
+                pieces.append(', ' + quote + glue.join(elements[:pos]) + quote)
+                line_count += pos
+            if pos < total:
+                lines = [quote + glue.join(elements[line:line + per_line]) + quote
+                         for line in range(pos, total, per_line)]
+                pieces.append((line_break if line_count else line_start) +
+                              line_break.join(lines))
+                line_count = total - pos - (len(lines) - 1) * per_line
+            yield ''.join(pieces)
+            if progress:
+                progress(done)
+    else:
+        column = wrap.column or float('inf')
+        count = wrap.count or float('inf')
+        line_length = 0
+        line_count = 0
+        for elements, done in chunks:
+            pieces = []
+            for element in elements:
+                quoted = quote + element + quote
+                if line_count == 0:
+                    pieces.append(line_start)
+                    line_length = wrap.indent + len(quoted)
+                    line_count = 1
+                elif (line_count >= count or
+                      line_length + len(quoted) + 3 > column):
+                    pieces.append(line_break)
+                    line_length = wrap.indent + len(quoted)
+                    line_count = 1
+                else:
+                    pieces.append(', ')
+                    line_length += len(quoted) + 2
+                    line_count += 1
+                pieces.append(quoted)
+            yield ''.join(pieces)
+            if progress:
+                progress(done)
+
+    yield '\n' + encl[1]
+
+
+def _format_array(chunks, encl, quote, wrap, width, progress):
+    if wrap:
+        return _iter_wrapped_array(chunks, encl, quote, wrap, width, progress)
+    return _iter_array(chunks, encl, quote, progress)
+
+
+def format_array(chunks, encl, quote="'", wrap=None, progress=None):
+    """
+    Return an iterator over the pieces of the array of the elements of
+    chunks, an iterable of (list of elements, fraction done) pairs, e.g. to
+    format elements made outside of this module (see the pipeline module).
+    progress, if given, is called with the fraction done after each chunk.
+
+    """
+    return _format_array(chunks, encl, quote, wrap, None, progress)
+
+
+def _is_ascii(text):
+    if hasattr(text, 'isascii'):
+        return text.isascii()
+    try:
+        if isinstance(text, bytes):
+            text.decode('ascii')
+        else:
+            text.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
+
+
+def _mark_ranges():
+    # Return a regular expression set of the combining marks (categories Mn,
+    # Mc and Me), which are found in the first two planes and in plane 14
+    ranges = []
+    for code in list(range(0x20000)) + list(range(0xE0000, 0xE1000)):
+        if code > sys.maxunicode:
+            break
+        if unicodedata.category(_unichr(code)) in ('Mn', 'Mc', 'Me'):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([ code, code ])
+    return u''.join(_unichr(first) if first == last else
+                    u'%s-%s' % (_unichr(first), _unichr(last))
+                    for first, last in ranges)
+
+
+def _unichr(code):
+    if sys.version_info[0] >= 3:
+        return chr(code)
+    return unichr(code)
+
+
+def split_graphemes(text):
+    """
+    Split the unicode text into the list of its grapheme clusters, i.e. the
+    characters as the user sees them: a base character with its combining
+    marks, variation selectors and emoji modifiers, emoji joined by zero
+    width joiners, a flag made of two regional indicators, or CR LF.
+
+    This follows the rules of Unicode extended grapheme clusters except for
+    the rarely used decomposed Hangul syllables and prepended marks.
+
+    """
+    global _grapheme
+    if _grapheme is None:
+        extend = _mark_ranges() + u'\u200c\u200d\ufe00-\ufe0f'
+        if sys.maxunicode > 0xFFFF:
+            character = u'.'
+            extend += _unichr(0x1F3FB) + u'-' + _unichr(0x1F3FF)
+            flag = u'[%s-%s]{2}' % (_unichr(0x1F1E6), _unichr(0x1F1FF))
+        else:
+            # Narrow build, characters above U+FFFF are surrogate pairs
+            character = u'(?:[\ud800-\udbff][\udc00-\udfff]|.)'
+            flag = u'(?:\ud83c[\udde6-\uddff]){2}'
+            extend += u']|\ud83c[\udffb-\udfff'
+        _grapheme = re.compile(u'\r\n|%s|%s(?:\u200d%s|[%s])*' %
+                               (flag, character, character, extend),
+                               re.DOTALL | re.UNICODE)
+    return _grapheme.findall(text)
+
+
+def _encoded(pieces):
+    # Encode the unicode pieces back to utf-8
+    for piece in pieces:
+        yield piece.encode('utf-8')
+
+
+def _escaped_chars(chunks, table):
+    # Escape the characters of chunks; map calls table.get(char, char)
+    # without running Python code per character
+    for elements, done in chunks:
+        yield list(map(table.get, elements, elements)), done
+
+
+def _escaped_elements(chunks, escape):
+    for elements, done in chunks:
+        yield list(map(escape, elements)), done
+
+
+def iter_char_array(text, encl, wrap=None, chunk_size=CHUNK_SIZE,
+                    progress=None, escape='none', unit='codepoints'):
+    """
+    Generator version of char_array.
+
+    progress, if given, is called with the fraction of text done so far after
+    each piece.
+
+    """
+    encode = False
+    if not _is_ascii(text):
+        if isinstance(text, bytes):
+            # utf-8 encoded text, the result is encoded the same way
+            text = text.decode('utf-8')
+            encode = True
+        if unit == 'graphemes':
+            text = split_graphemes(text)
+    elif unit == 'graphemes' and '\r\n' in text:
+        text = split_graphemes(text)
+    grouped = not isinstance(text, (bytes, type(u'')))
+
+    chunks = _chunks(text, chunk_size)
+    width = 3
+    if grouped:
+        # Grapheme clusters are not all of the same width, nor single
+        # characters to look up in the escape table
+        width = None
+        escape_element = get_escape(escape, "'")
+        if escape_element:
+            chunks = _escaped_elements(chunks, escape_element)
+    else:
+        table = get_escape_table(escape, "'")
+        if table:
+            # Escaped characters are not all of the same width
+            width = None
+            chunks = _escaped_chars(chunks, table)
+
+    pieces = _format_array(chunks, encl, "'", wrap, width, progress)
+    return _encoded(pieces) if encode else pieces
+
+
+# Whether dicts, and counters, keep the order their keys were added in
+_ordered_dicts = sys.version_info >= (3, 7)
+
+
+def _unique(words):
+    # The words without repetitions, in the order they first appear
+    if _ordered_dicts:
+        # dicts keep their order, fromkeys runs without Python code per word
+        return list(dict.fromkeys(words))
+    seen = set()
+    seen_add = seen.add
+    return [ word for word in words if not (word in seen or seen_add(word)) ]
+
+
+def _natural_key(word):
+    # The word with its runs of digits as numbers, e.g. item2 < item10
+    parts = _digits.split(word)
+    parts[1::2] = map(int, parts[1::2])
+    return parts
+
+
+# Prefixes of the runs of digits by their length, so that shorter numbers
+# sort first; '/' sorts right before the digits
+_length_prefixes = [ '/' + chr(0x40 + length) for length in range(0x40) ]
+
+
+def _natural_keys(joined):
+    # Return joined, the words joined by NUL characters, with every run of
+    # digits without leading zeros prefixed by its length. The runs are cut
+    # out by one split and prefixed by map, no Python code runs per run.
+    parts = _digits.split(joined)
+    digits = list(map(operator.methodcaller('lstrip', '0'), parts[1::2]))
+    lengths = list(map(len, digits))
+    if lengths and max(lengths) >= len(_length_prefixes):
+        lengths = [ min(length, len(_length_prefixes) - 1) for length in lengths ]
+    parts[1::2] = list(map(operator.add,
+                           map(_length_prefixes.__getitem__, lengths), digits))
+    return ''.join(parts)
+
+
+def _sort_by_keys(words, make_keys, key):
+    # Sort words by the keys made by make_keys from all the words joined, so
+    # that the keys are made in bulk instead of by a key function per word.
+    # key is the key function used when a word holds the joining character.
+    joined = '\0'.join(words)
+    if joined.count('\0') != len(words) - 1:
+        words.sort(key=key)
+        return
+    keys = make_keys(joined).split('\0')
+    order = sorted(range(len(words)), key=keys.__getitem__)
+    words[:] = map(words.__getitem__, order)
+
+
+def _decoded_lower(text):
+    return text.decode('utf-8').lower()
+
+
+def _caseless_sort(words):
+    # utf-8 encoded words are decoded, all at once, so that all their
+    # letters are folded and not only the ASCII ones
+    if words and isinstance(words[0], bytes):
+        _sort_by_keys(words, _decoded_lower, _decoded_lower)
+    else:
+        words.sort(key=operator.methodcaller('lower'))
+
+
+def _sort_words(words, sort, counts):
+    if sort == 'lexical':
+        words.sort()
+    elif sort == 'caseless':
+        _caseless_sort(words)
+    elif sort == 'natural':
+        _sort_by_keys(words, _natural_keys, _natural_key)
+    elif sort == 'frequency':
+        # Most frequent first; the sort is stable, also when reversed
+        words.sort(key=counts.__getitem__, reverse=True)
+    elif sort != 'none':
+        raise ValueError('unknown word order %r' % sort)
+
+
+def iter_word_array(text, encl, wrap=None, tokenizer=split_words,
+                    chunk_size=CHUNK_SIZE, progress=None, escape='none',
+                    unique=False, sort='none', count=False):
+    """
+    Generator version of word_array.
+
+    progress, if given, is called with the fraction of words done so far
+    after each piece.
+
+    """
+    words = tokenizer(text)
+    counts = None
+    if count or sort == 'frequency':
+        counts = Counter(words)
+    numbers = None
+    if (unique or count) and counts is not None and _ordered_dicts:
+        # The counter already holds the words in the order they first
+        # appear, and most_common sorts them by count keeping that order
+        if sort == 'frequency':
+            pairs = counts.most_common()
+            words = list(map(operator.itemgetter(0), pairs))
+            numbers = list(map(operator.itemgetter(1), pairs))
+            sort = 'none'
+        else:
+            words = list(counts)
+    elif unique or count:
+        words = _unique(words)
+    elif not isinstance(words, list):
+        words = list(words)
+    _sort_words(words, sort, counts)
+
+    escape_word = get_escape(escape, "'")
+    if count:
+        # Each element is a pair of the quoted word and its count, formatted
+        # by map without Python code per word
+        element = "%s '%%s', %%d %s" % (encl[0].replace('%', '%%'),
+                                         encl[1].replace('%', '%%'))
+        if numbers is None:
+            numbers = list(map(counts.__getitem__, words))
+        if escape_word:
+            words = list(map(escape_word, words))
+        words = list(map(element.__mod__, zip(words, numbers)))
+        return _format_array(_chunks(words, chunk_size), encl, '',
+                             wrap, None, progress)
+    if escape_word:
+        words = list(map(escape_word, words))
+    return _format_array(_chunks(words, chunk_size), encl, "'",
+                         wrap, None, progress)
+
+
+def char_array(text, encl, wrap=None, escape='none', unit='codepoints'):
+    """
+    Return text as an array of quoted characters, e.g. "{ 'a', 'b' }".
+
+    encl is a pair of (opening, closing) array symbols. wrap, a Wrap, breaks
+    the array over several lines. escape, one of ESCAPES, escapes the
+    characters for the literals of that language. unit, one of CHAR_UNITS,
+    makes the elements code points or grapheme clusters.
+
+    """
+    return ''.join(iter_char_array(text, encl, wrap, escape=escape, unit=unit))
+
+
+def word_array(text, encl, wrap=None, tokenizer=split_words, escape='none',
+               unique=False, sort='none', count=False):
+    """
+    Return text as an array of quoted words, e.g. "{ 'foo', 'bar' }".
+
+    encl is a pair of (opening, closing) array symbols. wrap, a Wrap, breaks
+    the array over several lines. tokenizer splits text into words, see
+    get_tokenizer. escape, one of ESCAPES, escapes the words for the
+    literals of that language.
+
+    unique drops the repeated words. sort, one of WORD_SORTS, orders the
+    words: lexical, caseless, natural (numbers in words compared as numbers)
+    or frequency (most frequent first). count makes each element a pair of
+    a word and its number of occurrences, e.g. "{ { 'foo', 2 } }", and
+    implies unique.
+
+    """
+    return ''.join(iter_word_array(text, encl, wrap, tokenizer, escape=escape,
+                                   unique=unique, sort=sort, count=count))
+
+
+# Hex literals of all byte values, for arrays of single bytes
+_hex_bytes = [ '0x%02x' % value for value in range(256) ]
+
+# array.array type codes of the unsigned integers of 2 and 4 bytes
+_array_codes = {}
+for _code in 'HIL':
+    _array_codes.setdefault(array(_code).itemsize, _code)
+
+
+def _hex_elements(block, width, byteorder):
+    # Return the hex literals of the width bytes integers of block. A last
+    # incomplete integer is padded with zero bytes.
+    if width == 1:
+        return list(map(_hex_bytes.__getitem__, bytearray(block)))
+
+    if len(block) % width:
+        block = block + b'\0' * (width - len(block) % width)
+    values = array(_array_codes[width])
+    if hasattr(values, 'frombytes'):
+        values.frombytes(block)
+    else:
+        values.fromstring(block)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return list(map(('0x%%0%dx' % (width * 2)).__mod__, values))
+
+
+def _byte_chunks(data, width, byteorder, chunk_size):
+    # Yield (hex literals, fraction done) pairs for data, chunk_size
+    # integers of width bytes at a time
+    total = len(data)
+    step = chunk_size * width
+    for pos in range(0, total, step):
+        yield (_hex_elements(data[pos:pos + step], width, byteorder),
+               min(pos + step, total) / float(total))
+
+
+def iter_byte_array(data, encl, width=1, byteorder='little', wrap=None,
+                    chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Generator version of byte_array.
+
+    progress, if given, is called with the fraction of data done so far
+    after each piece.
+
+    """
+    if isinstance(data, type(u'')):
+        data = data.encode('utf-8')
+    return _format_array(_byte_chunks(data, width, byteorder, chunk_size),
+                         encl, '', wrap, 2 + width * 2, progress)
+
+
+def iter_file_byte_array(file_name, encl, width=1, byteorder='little',
+                         wrap=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Like iter_byte_array, for the content of the file file_name. The file is
+    memory mapped and only read as far as the generator is advanced.
+
+    """
+    file_object = open(file_name, 'rb')
+    try:
+        if os.fstat(file_object.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            data = b''
+        else:
+            data = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for piece in iter_byte_array(data, encl, width, byteorder, wrap,
+                                         chunk_size, progress):
+                yield piece
+        finally:
+            if data:
+                data.close()
+    finally:
+        file_object.close()
+
+
+def byte_array(data, encl, width=1, byteorder='little', wrap=None):
+    """
+    Return the bytes of data as an array of hex literals, like xxd -i does,
+    e.g. "{ 0x48, 0x69 }".
+
+    width is the size in bytes (1, 2 or 4) of the integers and byteorder
+    ('little' or 'big') the order of their bytes in data. Unicode text is
+    encoded to utf-8 first. encl and wrap are
+    the same as for char_array.
+
+    """
+    return ''.join(iter_byte_array(data, encl, width, byteorder, wrap))
+
+
+def iter_per_line(text, transform, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Apply transform to every line of text, e.g. to quote each of them.
+
+    transform is called as transform(line) and returns an iterator over the
+    pieces of the modified line, like the iter_* functions. The leading and
+    trailing spaces and the line ends stay outside of the modification, blank
+    lines are left as they are.
+
+    progress, if given, is called with the fraction of lines done so far
+    after each piece of chunk_size lines.
+
+    """
+    lines = text.splitlines(True)
+    total = len(lines)
+    for pos in range(0, total, chunk_size):
+        pieces = []
+        for line in lines[pos:pos + chunk_size]:
+            stripped = line.lstrip()
+            content = stripped.rstrip()
+            if content:
+                pieces.append(line[:len(line) - len(stripped)])
+                pieces.extend(transform(content))
+                pieces.append(stripped[len(content):])
+            else:
+                pieces.append(line)
+        yield ''.join(pieces)
+        if progress:
+            progress(min(pos + chunk_size, total) / float(total))
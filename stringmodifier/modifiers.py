@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+#  Modifiers of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module maps the modifiers, by the name of their menu action, to the
+transformations of the engine module, set up from the options list of
+the plugin. It does not depend on gtk.
+
+Functions:
+option
+custom_enclosure
+per_line_base
+is_reverse
+enclosure
+wrap
+tokenizer
+escape
+byte_array_options
+result_options
+cache_budget
+pipelines
+templates
+get_transform
+apply
+
+"""
+
+from functools import partial
+from collections import OrderedDict
+from gettext import gettext as _
+
+from . import engine
+from . import scanner
+from . import pipeline
+from . import template
+
+encl_char = (('{', '}'), ('[', ']'), ('(', ')'))
+
+byte_widths = (1, 2, 4)
+
+byte_orders = ('little', 'big')
+
+# Entries of the configuration file, in the order of the options list of
+# the plugin, and their default values
+option_names = [ 'AccelBraces', 'AccelBrackets', 'AccelQuotes', 'AccelCustom',
+                 'AccelStr2Array', 'AccelStr2WArray', 'AccelStr2BArray',
+                 'CustomStart', 'CustomEnd',
+                 'RadioCharArray', 'RadioWordArray', 'RadioByteArray',
+                 'RadioByteWidth', 'RadioByteOrder',
+                 'WrapArray', 'WrapColumn', 'WrapCount', 'WrapIndent',
+                 'WordTokenizer', 'WordPattern', 'Pipelines', 'Templates',
+                 'EscapeMode', 'CharUnit', 'WordUnique', 'WordSort', 'WordCount',
+                 'CacheSize' ]
+
+default_options = [ '', '', '', '', '', '', '', '"', '"', 0, 0, 0, 0, 0,
+                    0, 79, 0, 4, 0, '', '', '', 0, 0, 0, 0, 0, 32 ]
+
+# Position of each option in the options list, by name
+option_index = dict((name, index) for index, name in enumerate(option_names))
+
+# Modifiers of the selected text, in menu order
+names = [ 'Braces', 'Brackets', 'Quotes', 'Custom',
+          'Str2CharArray', 'Str2WordArray', 'Str2ByteArray',
+          'Array2Str', 'StripEnclosure' ]
+
+# Modifiers turning the results of the others back into plain text
+reverse_names = [ 'Array2Str', 'StripEnclosure' ]
+
+# Name suffix of the modifiers applied to each line of the selection
+per_line_suffix = 'PerLine'
+
+# Name prefix of the pipelines defined in the Pipelines option
+pipeline_prefix = 'Pipeline'
+
+# Name prefix of the modifiers defined in the Templates option
+template_prefix = 'Template'
+
+# Compiled templates of the last Templates and word tokenizer options, see
+# templates
+_compiled_templates = {}
+
+labels = { 'Braces': _('Add curly braces'),
+           'Brackets': _('Add brackets'),
+           'Quotes': _('Add quotes'),
+           'Custom': _('Add custom encl.'),
+           'Str2CharArray': _('String to char array'),
+           'Str2WordArray': _('String to word array'),
+           'Str2ByteArray': _('String to byte array'),
+           'Array2Str': _('Array to string'),
+           'StripEnclosure': _('Strip enclosure') }
+
+
+def option(options, name):
+    """Return the value of the option name in options."""
+    return options[option_index[name]]
+
+
+def custom_enclosure(options):
+    """Return the (opening, closing) symbols of the custom enclosure."""
+    return (option(options, 'CustomStart'), option(options, 'CustomEnd'))
+
+
+def per_line_base(name):
+    """
+    Return the modifier applied to each line by the modifier name, None if
+    name is not applied per line. Only the modifiers of names are applied
+    per line, a pipeline or template may have a name ending with
+    per_line_suffix.
+
+    """
+    if name.endswith(per_line_suffix):
+        base = name[:-len(per_line_suffix)]
+        if base in names:
+            return base
+    return None
+
+
+def is_reverse(name):
+    """Return whether name is a reverse modifier, applied per line or not."""
+    return (per_line_base(name) or name) in reverse_names
+
+
+def enclosure(name, options):
+    """
+    Return the (opening, closing) symbols of the enclose modifier name, None
+    if name is not an enclose modifier, or if the enclosed text has to be
+    escaped (quotes with an escaping set in options).
+
+    """
+    if name == 'Braces':
+        return ('{', '}')
+    elif name == 'Brackets':
+        return ('[', ']')
+    elif name == 'Quotes':
+        if escape(options) != 'none':
+            return None
+        return ('"', '"')
+    elif name == 'Custom':
+        return custom_enclosure(options)
+    return None
+
+
+def wrap(options):
+    """Return the engine.Wrap set in options, None if wrapping is off."""
+    if not int(option(options, 'WrapArray')):
+        return None
+    return engine.Wrap(int(option(options, 'WrapColumn')),
+                       int(option(options, 'WrapCount')),
+                       int(option(options, 'WrapIndent')))
+
+
+def tokenizer(options):
+    """
+    Return the word tokenizer set in options, see engine.get_tokenizer. An
+    invalid custom regular expression raises re.error.
+
+    """
+    return engine.get_tokenizer(engine.TOKENIZERS[int(option(options, 'WordTokenizer'))],
+                                option(options, 'WordPattern'))
+
+
+def escape(options):
+    """Return the escaping (one of engine.ESCAPES) set in options."""
+    return engine.ESCAPES[int(option(options, 'EscapeMode'))]
+
+
+def byte_array_options(options):
+    """Return the keyword arguments of engine.iter_byte_array from options."""
+    return dict(encl=encl_char[int(option(options, 'RadioByteArray'))],
+                width=byte_widths[int(option(options, 'RadioByteWidth'))],
+                byteorder=byte_orders[int(option(options, 'RadioByteOrder'))],
+                wrap=wrap(options))
+
+
+def result_options(options):
+    """
+    Return the tuple of the options the results of the modifiers depend on,
+    i.e. all of them but the accelerators and the cache size.
+
+    """
+    return tuple(options[option_index['CustomStart']:option_index['CacheSize']])
+
+
+def cache_budget(options):
+    """Return the budget of the result cache set in options, in bytes."""
+    return int(option(options, 'CacheSize')) * 1024 * 1024
+
+
+def pipelines(options):
+    """
+    Return the pipelines defined in options, see pipeline.parse_pipelines.
+    An invalid definition raises ValueError.
+
+    """
+    return pipeline.parse_pipelines(option(options, 'Pipelines'))
+
+
+def templates(options):
+    """
+    Return an ordered dictionary of the transformations of the templates
+    defined in options, by name, see template.compile_template. They are
+    compiled once and reused as long as the options they depend on are the
+    same. An invalid definition raises ValueError.
+
+    """
+    key = (option(options, 'Templates'), option(options, 'WordTokenizer'),
+           option(options, 'WordPattern'))
+    try:
+        return _compiled_templates[key]
+    except KeyError:
+        pass
+
+    word_tokenizer = tokenizer(options)
+    definitions = template.parse_templates(option(options, 'Templates'))
+    compiled = OrderedDict(
+        (name, template.compile_template(definition, tokenizer=word_tokenizer))
+        for name, definition in definitions.items())
+
+    # Only the templates of the current options are kept
+    _compiled_templates.clear()
+    _compiled_templates[key] = compiled
+    return compiled
+
+
+def get_transform(name, options):
+    """
+    Return the transformation of the modifier name as set up by options. It
+    is called as transform(text, progress=None) and returns an iterator over
+    the pieces of the result, like the engine's iter_* functions.
+
+    Modifier names ending with per_line_suffix apply the modifier to each
+    line of the text (see per_line_base) and names starting with pipeline_prefix run the
+    pipeline of that name, or with template_prefix the template of that name.
+    re.error is raised when options hold an invalid
+    regular expression and ValueError when they hold an invalid pipeline or
+    template.
+
+    The transformations of the reverse modifiers parse the whole text before
+    they return, so that text they can't parse raises ValueError at the call
+    of the transformation, before any piece of the result is used.
+
+    """
+    symbols = enclosure(name, options)
+    base = per_line_base(name)
+    if base:
+        transform = partial(engine.iter_per_line,
+                            transform=get_transform(base, options))
+        if is_reverse(name):
+            return lambda text, progress=None: list(transform(text, progress=progress))
+        return transform
+    elif symbols:
+        return partial(engine.iter_enclose, opening_symbol=symbols[0],
+                       closing_symbol=symbols[1])
+    elif name == 'Quotes':
+        return partial(engine.iter_enclose, opening_symbol='"',
+                       closing_symbol='"', escape=escape(options))
+    elif name == 'Str2CharArray':
+        return partial(engine.iter_char_array,
+                       encl=encl_char[int(option(options, 'RadioCharArray'))],
+                       wrap=wrap(options), escape=escape(options),
+                       unit=engine.CHAR_UNITS[int(option(options, 'CharUnit'))])
+    elif name == 'Str2WordArray':
+        return partial(engine.iter_word_array,
+                       encl=encl_char[int(option(options, 'RadioWordArray'))],
+                       wrap=wrap(options), tokenizer=tokenizer(options),
+                       escape=escape(options),
+                       unique=bool(int(option(options, 'WordUnique'))),
+                       sort=engine.WORD_SORTS[int(option(options, 'WordSort'))],
+                       count=bool(int(option(options, 'WordCount'))))
+    elif name == 'Str2ByteArray':
+        return partial(engine.iter_byte_array, **byte_array_options(options))
+    elif name == 'Array2Str':
+        return partial(scanner.iter_array_to_string, escape=escape(options),
+                       width=byte_widths[int(option(options, 'RadioByteWidth'))],
+                       byteorder=byte_orders[int(option(options, 'RadioByteOrder'))])
+    elif name == 'StripEnclosure':
+        return partial(scanner.iter_strip_enclosure,
+                       pairs=encl_char + (('"', '"'), custom_enclosure(options)),
+                       escape=escape(options))
+    elif name.startswith(pipeline_prefix):
+        steps = pipelines(options).get(name[len(pipeline_prefix):])
+        if steps:
+            return pipeline.compile_pipeline(steps, tokenizer=tokenizer(options),
+                                             wrap=wrap(options),
+                                             custom=custom_enclosure(options))
+    elif name.startswith(template_prefix):
+        transform = templates(options).get(name[len(template_prefix):])
+        if transform:
+            return transform
+    raise KeyError(name)
+
+
+def apply(name, options, text):
+    """Return text modified by the modifier name as set up by options."""
+    return ''.join(get_transform(name, options)(text))
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+#
+#  Pipelines of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module runs pipelines of modifier steps, such as
+
+    words | unique | quote | enclose(paren)
+
+in a single pass over the text. The steps are chained generators, each one
+handing its elements, or pieces of text, on to the next one as soon as they
+are made, so no step waits for a whole intermediate result (except sort).
+A compiled pipeline is a transformation like the engine's iter_* functions.
+
+Steps, in the order they can follow each other:
+  chars, words, lines   -- split the text into elements; words uses the
+                           word tokenizer (tokenize is the same step)
+  unique, sort, strip,  -- drop repeated elements (dedupe is the same step),
+  quote(C)                 sort them, strip their spaces and drop blank
+                           ones, enclose each in C (default ")
+  array(E), join(S)     -- make the text of the elements: an array enclosed
+                           by E (default brace), or the elements separated
+                           by S (default ", "); join is implied when missing
+  enclose(E)            -- enclose the text by E (default custom)
+
+E is one of brace, bracket, paren, quote or custom (the custom enclosure).
+Arguments may be quoted, e.g. join("; ").
+
+Pipelines are defined as "Name: step | step ...", several of them separated
+by semicolons, see parse_pipelines.
+
+Functions:
+parse_pipeline
+parse_pipelines
+compile_pipeline
+
+"""
+
+import re
+from collections import OrderedDict
+
+from . import engine
+
+# Steps by stage; the stages of a pipeline's steps never decrease
+SOURCE_STEPS = ('chars', 'words', 'lines')
+ELEMENT_STEPS = ('unique', 'sort', 'strip', 'quote')
+FORMAT_STEPS = ('array', 'join')
+TEXT_STEPS = ('enclose',)
+
+_aliases = { 'tokenize': 'words', 'dedupe': 'unique' }
+
+_defaults = { 'quote': '"', 'array': 'brace', 'join': ', ', 'enclose': 'custom' }
+
+enclosures = { 'brace': ('{', '}'),
+               'bracket': ('[', ']'),
+               'paren': ('(', ')'),
+               'quote': ('"', '"'),
+               'custom': None }
+
+_step_pattern = re.compile(r'^\s*(\w+)\s*(?:\((.*)\))?\s*$', re.DOTALL)
+
+_name_pattern = re.compile(r'^\w+$')
+
+
+def _stage(step):
+    for stage, steps in enumerate((SOURCE_STEPS, ELEMENT_STEPS, FORMAT_STEPS,
+                                   TEXT_STEPS)):
+        if step in steps:
+            return stage
+    raise ValueError('unknown step %s' % step)
+
+
+def _split_top(text, separator):
+    # Split text at the separators outside of parentheses
+    parts = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(0, depth - 1)
+        elif char == separator and depth == 0:
+            parts.append(text[start:pos])
+            start = pos + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _unquote(arg):
+    arg = arg.strip()
+    if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in '"\'':
+        return arg[1:-1]
+    return arg
+
+
+def parse_pipeline(definition):
+    """
+    Return the list of (step, argument) pairs of definition, steps separated
+    by '|'. Aliases are replaced by their step, missing arguments by their
+    default and the join step is added when the elements are not made into
+    text. ValueError is raised for invalid definitions.
+
+    """
+    steps = []
+    stage = 0
+    for part in _split_top(definition, '|'):
+        match = _step_pattern.match(part)
+        if not match:
+            raise ValueError('invalid step %r' % part.strip())
+        step = _aliases.get(match.group(1), match.group(1))
+        arg = match.group(2)
+
+        step_stage = _stage(step)
+        if step_stage < stage or (step_stage == 0 and steps):
+            raise ValueError('step %s out of order' % step)
+        if step_stage in (1, 2) and not steps:
+            raise ValueError('step %s needs elements, start with %s' %
+                             (step, ', '.join(SOURCE_STEPS)))
+        if step_stage == 3 and stage in (0, 1) and steps:
+            steps.append(('join', _defaults['join']))
+        stage = step_stage
+
+        if arg is None:
+            arg = _defaults.get(step)
+        elif step in SOURCE_STEPS or step in ('unique', 'sort', 'strip'):
+            raise ValueError('step %s takes no argument' % step)
+        else:
+            arg = _unquote(arg)
+        if step in ('array', 'enclose') and arg not in enclosures:
+            raise ValueError('unknown enclosure %s, use one of %s' %
+                             (arg, ', '.join(sorted(enclosures))))
+        steps.append((step, arg))
+
+    if not steps:
+        raise ValueError('empty pipeline')
+    if stage in (0, 1):
+        steps.append(('join', _defaults['join']))
+    return steps
+
+
+def parse_pipelines(definitions):
+    """
+    Return an ordered dictionary of the steps (see parse_pipeline) of the
+    pipelines of definitions, by name, e.g. for
+
+        ParenWords: words | unique | quote | enclose(paren); Lines: lines
+
+    Names are made of letters, digits and underscores. ValueError is raised
+    for invalid definitions.
+
+    """
+    pipelines = OrderedDict()
+    for part in _split_top(definitions, ';'):
+        if not part.strip():
+            continue
+        name, colon, definition = part.partition(':')
+        name = name.strip()
+        if not colon or not _name_pattern.match(name):
+            raise ValueError('invalid pipeline %r, expected Name: steps' % part.strip())
+        if name in pipelines:
+            raise ValueError('pipeline %s defined twice' % name)
+        try:
+            pipelines[name] = parse_pipeline(definition)
+        except ValueError as error:
+            raise ValueError('pipeline %s: %s' % (name, error))
+    return pipelines
+
+
+def _split(step, text, tokenizer, chunk_size):
+    # Yield (chunk of elements, fraction done) pairs of the elements of text
+    if step == 'chars':
+        elements = engine.split_chars(text)
+    elif step == 'words':
+        elements = tokenizer(text)
+    else:
+        elements = text.splitlines()
+    total = len(elements)
+    for pos in range(0, total, chunk_size):
+        yield elements[pos:pos + chunk_size], min(pos + chunk_size, total) / float(total)
+
+
+def _unique(chunks):
+    seen = set()
+    for elements, done in chunks:
+        kept = []
+        for element in elements:
+            if element not in seen:
+                seen.add(element)
+                kept.append(element)
+        yield kept, done
+
+
+def _sort(chunks, chunk_size):
+    elements = []
+    for chunk, done in chunks:
+        elements.extend(chunk)
+    elements.sort()
+    for pos in range(0, len(elements), chunk_size):
+        yield elements[pos:pos + chunk_size], 1.0
+
+
+def _strip(chunks):
+    for elements, done in chunks:
+        yield [ element.strip() for element in elements if element.strip() ], done
+
+
+def _quote(chunks, quote):
+    for elements, done in chunks:
+        yield [ quote + element + quote for element in elements ], done
+
+
+def _join(chunks, separator, progress):
+    glue = ''
+    for elements, done in chunks:
+        if elements:
+            yield glue + separator.join(elements)
+            glue = separator
+        if progress:
+            progress(done)
+
+
+def _enclose(pieces, encl):
+    yield encl[0]
+    for piece in pieces:
+        yield piece
+    yield encl[1]
+
+
+def compile_pipeline(steps, tokenizer=engine.split_words, wrap=None,
+                     custom=('"', '"'), chunk_size=engine.CHUNK_SIZE):
+    """
+    Return the transformation running steps (see parse_pipeline), called as
+    transform(text, progress=None) and returning an iterator over the pieces
+    of the result.
+
+    tokenizer is used by the words step, wrap (an engine.Wrap) by the array
+    step and custom is the (opening, closing) custom enclosure.
+
+    """
+    def encl(name):
+        return enclosures[name] or custom
+
+    def transform(text, progress=None):
+        chunks = None
+        pieces = None
+        for step, arg in steps:
+            if step in SOURCE_STEPS:
+                chunks = _split(step, text, tokenizer, chunk_size)
+            elif step == 'unique':
+                chunks = _unique(chunks)
+            elif step == 'sort':
+                chunks = _sort(chunks, chunk_size)
+            elif step == 'strip':
+                chunks = _strip(chunks)
+            elif step == 'quote':
+                chunks = _quote(chunks, arg)
+            elif step == 'array':
+                pieces = engine.format_array(chunks, encl(arg), '', wrap, progress)
+            elif step == 'join':
+                pieces = _join(chunks, arg, progress)
+            elif step == 'enclose':
+                pieces = _enclose([ text ] if pieces is None else pieces, encl(arg))
+
+        for piece in [ text ] if pieces is None else pieces:
+            yield piece
+        if chunks is None and progress:
+            progress(1.0)
+
+    return transform
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+#
+#  Reverse modifiers of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module turns the results of the modifiers back into plain text: array
+literals into the string of their elements, and enclosed text into the text
+without its enclosure.
+
+The text is read by a scanner making a single pass from start to end. It
+steps from token to token, not from character to character: the body of a
+quoted element, the spaces between elements or the text between two
+brackets are each matched by one regular expression call, and only the
+escapes call back into Python, so long literals are read in linear time.
+Arrays without nested arrays, such as char and byte arrays, are read by a
+single search over the whole array.
+
+Functions:
+parse_array
+array_to_string
+strip_enclosure
+iter_array_to_string
+iter_strip_enclosure
+
+"""
+
+import re
+import sys
+from array import array
+
+from . import engine
+
+# Array symbols understood by the scanner
+ARRAY_PAIRS = (('{', '}'), ('[', ']'), ('(', ')'))
+
+# Spaces between tokens
+_spaces = re.compile(r'\s*')
+
+# Unquoted elements, e.g. numbers
+_bare_pattern = r'[^\s,\'"{}\[\]()]+'
+_bare = re.compile(_bare_pattern)
+
+# Escapes of the string literals of C, Python, JavaScript, Java and Go
+_escape = re.compile(r'\\(?:([0-7]{1,3})|x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|'
+                     r'U([0-9a-fA-F]{8})|(.))', re.DOTALL)
+
+# Symbols that may hide a bracket, or close a quoted literal
+_brackets = re.compile(r'[^\'"\\{}\[\]()]+')
+
+
+def _body_pattern(quote, escaped):
+    # Pattern of the body of a literal quoted by quote, up to its closing
+    # quote. Escaped bodies hold backslash escapes; in the others, as made
+    # with the escaping off, a quote closes the literal only when a comma or
+    # a closing symbol follows it.
+    if escaped:
+        return r'[^%s\\]*(?:\\.[^%s\\]*)*' % (quote, quote)
+    return r'[^%s]*(?:%s(?!\s*[,}\])])[^%s]*)*' % (quote, quote, quote)
+
+
+def _make_syntax(escaped):
+    # Return the compiled patterns of the array literals with escaped (or
+    # raw) quoted elements: the bodies of the literals by quote, and the
+    # items of the arrays without nested arrays, e.g. char and byte arrays,
+    # which are all found by a single search. An item is an element and its
+    # comma; any other character is found as junk, the last group.
+    single = _body_pattern("'", escaped)
+    double = _body_pattern('"', escaped)
+    return { 'bodies': { "'": re.compile(single, re.DOTALL),
+                         '"': re.compile(double, re.DOTALL) },
+             'flat_items': re.compile(r"\s*(?:'(%s)'|\"(%s)\"|(%s))\s*(?:,|\Z)|(\S)" %
+                                      (single, double, _bare_pattern), re.DOTALL) }
+
+_syntaxes = { True: _make_syntax(True), False: _make_syntax(False) }
+
+# Bodies of the quoted literals of text in general, closed by the next quote
+_plain_bodies = { "'": re.compile(r"[^']*"), '"': re.compile(r'[^"]*') }
+
+
+def _unescape_match(match):
+    octal, hex2, hex4, hex8, char = match.groups()
+    # The characters of the letter escapes are the engine's
+    if char is not None:
+        return engine._letter_chars.get(char, char)
+    return engine._unichr(int(octal, 8) if octal else int(hex2 or hex4 or hex8, 16))
+
+
+def _unescape(body):
+    # Only bodies holding escapes pay for the substitution
+    if '\\' not in body:
+        return body
+    return _escape.sub(_unescape_match, body)
+
+
+def _decode(text):
+    # Return (unicode text, whether the result has to be encoded back to
+    # utf-8), utf-8 strings being the text of the plugin under Python 2
+    if isinstance(text, bytes):
+        return text.decode('utf-8'), True
+    return text, False
+
+
+def _parse_quoted(text, pos, escaped):
+    # Return (body, position after the closing quote) of the quoted literal
+    # starting at pos, the body unescaped if escaped
+    quote = text[pos]
+    end = _syntaxes[escaped]['bodies'][quote].match(text, pos + 1).end()
+    if end >= len(text):
+        raise ValueError('%s literal at %d is not closed' % (quote, pos))
+    body = text[pos + 1:end]
+    return _unescape(body) if escaped else body, end + 1
+
+
+def _parse_elements(text, pos, closing, escaped, elements, kinds):
+    # Append the elements of the array whose opening symbol is before pos to
+    # elements, and their kinds ('quoted' or 'bare') to kinds. Return (the
+    # position after the closing symbol, whether the array holds arrays).
+    length = len(text)
+    expect_element = True
+    nested = False
+    while True:
+        pos = _spaces.match(text, pos).end()
+        if pos >= length:
+            raise ValueError('array is not closed by %s' % closing)
+        char = text[pos]
+        if char == closing:
+            # A comma may follow the last element
+            return pos + 1, nested
+        if not expect_element:
+            if char != ',':
+                raise ValueError('expected , or %s at %d' % (closing, pos))
+            expect_element = True
+            pos += 1
+            continue
+
+        if char in '\'"':
+            element, pos = _parse_quoted(text, pos, escaped)
+            elements.append(element)
+            kinds.append('quoted')
+        elif char in '{[(':
+            # Nested arrays, e.g. words with their counts, are flattened
+            pos, unused = _parse_elements(text, pos + 1, dict(ARRAY_PAIRS)[char],
+                                          escaped, elements, kinds)
+            nested = True
+        else:
+            match = _bare.match(text, pos)
+            if not match:
+                raise ValueError('unexpected %s at %d' % (char, pos))
+            elements.append(match.group())
+            kinds.append('bare')
+            pos = match.end()
+        expect_element = False
+
+
+def parse_array(text, escape='none'):
+    """
+    Return the list of the elements of the array literal text, e.g.
+    ['a', 'b'] for "{ 'a', 'b' }", the list of their kinds: 'quoted' for
+    quoted literals or 'bare' for the others, such as numbers, and whether
+    the array holds nested arrays. The array is enclosed by one of
+    ARRAY_PAIRS; nested arrays are flattened.
+
+    escape is the escaping (one of engine.ESCAPES) the array was made with:
+    quoted literals are unescaped unless it is 'none'. ValueError is raised
+    when text is not an array.
+
+    """
+    escaped = escape != 'none'
+    pos = _spaces.match(text).end()
+    if pos >= len(text) or text[pos] not in '{[(':
+        raise ValueError('no array found')
+    closing = dict(ARRAY_PAIRS)[text[pos]]
+
+    end = len(text.rstrip()) - 1
+    if text[end] == closing:
+        found = _syntaxes[escaped]['flat_items'].findall(text, pos + 1, end)
+        if not any([ junk for single, double, bare, junk in found ]):
+            if escaped:
+                elements = [ _unescape(single or double) if bare == '' else bare
+                             for single, double, bare, junk in found ]
+            else:
+                elements = [ single or double or bare
+                             for single, double, bare, junk in found ]
+            kinds = [ 'quoted' if bare == '' else 'bare'
+                      for single, double, bare, junk in found ]
+            return elements, kinds, False
+
+    elements = []
+    kinds = []
+    pos, nested = _parse_elements(text, pos + 1, closing, escaped, elements, kinds)
+    if text[pos:].strip():
+        raise ValueError('text after the end of the array at %d' % pos)
+    return elements, kinds, nested
+
+
+def _is_integer(element):
+    try:
+        int(element, 0)
+    except ValueError:
+        return False
+    return True
+
+
+def _integer_bytes(elements, width, byteorder):
+    # Return the bytes of the integer literals elements, each one of width
+    # bytes in byteorder, without the zero bytes padding the last integer
+    values = [ int(element, 0) for element in elements ]
+    if min(values) < 0 or max(values) >= 1 << (8 * width):
+        raise ValueError('the array holds integers of more than %d byte%s' %
+                         (width, 's' if width > 1 else ''))
+    if width == 1:
+        return bytearray(values)
+
+    data = array(engine._array_codes[width], values)
+    if byteorder != sys.byteorder:
+        data.byteswap()
+    data = bytearray(data.tobytes() if hasattr(data, 'tobytes') else data.tostring())
+    # The last integer may have been padded (see engine.byte_array)
+    last = data[-width:]
+    padding = min(len(last) - len(last.rstrip(b'\0')), width - 1)
+    if padding:
+        del data[-padding:]
+    return data
+
+
+def array_to_string(text, escape='none', width=1, byteorder='little'):
+    """
+    Return the string of the elements of the array literal text (see
+    parse_array), the reverse of the char, word and byte arrays:
+      - integers (a byte array) are integers of width bytes in byteorder,
+        as set for byte arrays, decoded as utf-8; ValueError is raised for
+        larger integers
+      - the elements of an array of arrays (a counted word array) are words,
+        joined by a space; the counts are dropped
+      - characters, i.e. elements of a single grapheme cluster, are
+        concatenated; a word array of one-letter words reads the same as a
+        char array, and is taken as one
+      - other elements are words, joined by a space; numbers among quoted
+        elements are dropped
+    Spaces around the array are kept. ValueError is raised when text is not
+    an array.
+
+    """
+    text, encode = _decode(text)
+    elements, kinds, nested = parse_array(text, escape)
+    start = len(text) - len(text.lstrip())
+    end = len(text.rstrip())
+
+    if elements and 'quoted' not in kinds and all(map(_is_integer, elements)):
+        data = _integer_bytes(elements, width, byteorder)
+        try:
+            result = data.decode('utf-8')
+        except UnicodeError:
+            raise ValueError('the bytes of the array are not utf-8 text')
+    else:
+        if 'bare' in kinds and 'quoted' in kinds:
+            elements = [ element for element, kind in zip(elements, kinds)
+                         if kind == 'quoted' ]
+        joined = u''.join(elements)
+        if nested:
+            result = u' '.join(elements)
+        elif (max(map(len, elements)) <= 1 if elements else True) or \
+                len(engine.split_graphemes(joined)) == len(elements):
+            result = joined
+        else:
+            result = u' '.join(elements)
+    result = text[:start] + result + text[end:]
+    return result.encode('utf-8') if encode else result
+
+
+def _closing_position(text, opening, closing, escaped):
+    # Return the position of the symbol closing the opening symbol at the
+    # start of text, skipping quoted literals, None if there is none. Quotes
+    # that are not closed or that follow a letter, such as apostrophes in
+    # prose, are taken as plain characters.
+    depth = 0
+    pos = 0
+    length = len(text)
+    bodies = _syntaxes[True]['bodies'] if escaped else _plain_bodies
+    while pos < length:
+        match = _brackets.match(text, pos)
+        if match:
+            pos = match.end()
+            if pos >= length:
+                break
+        char = text[pos]
+        if char in '\'"':
+            end = bodies[char].match(text, pos + 1).end()
+            if end < length and not (pos and text[pos - 1].isalnum()):
+                pos = end + 1
+            else:
+                pos += 1
+        elif char == '\\':
+            pos += 2 if escaped else 1
+        else:
+            if char == opening:
+                depth += 1
+            elif char == closing:
+                depth -= 1
+                if depth == 0:
+                    return pos
+            pos += 1
+    return None
+
+
+def strip_enclosure(text, pairs, quote='"', escape='none'):
+    """
+    Return text without the enclosure of the whole of it, the reverse of
+    the enclose modifiers. pairs are the (opening, closing) symbols that
+    may enclose text. The opening bracket has to be closed by the last
+    symbol of text, so "(a) (b)" is not enclosed; brackets in quoted
+    literals are skipped.
+
+    Text quoted by quote is unescaped when escape (one of engine.ESCAPES) is
+    not 'none', as the Quotes modifier escapes it. Spaces around the
+    enclosure are kept. ValueError is raised when text is not enclosed.
+
+    """
+    escaped = escape != 'none'
+    start = len(text) - len(text.lstrip())
+    end = len(text.rstrip())
+    body = text[start:end]
+
+    if escaped and len(body) >= 2 and body[0] == quote == body[-1]:
+        bodies = _syntaxes[escaped]['bodies']
+        if bodies.get(quote, bodies['"']).match(body, 1).end() != len(body) - 1:
+            raise ValueError('the quotes do not enclose the whole text')
+        content, encode = _decode(body[1:-1])
+        content = _unescape(content)
+        if encode:
+            content = content.encode('utf-8')
+        return text[:start] + content + text[end:]
+
+    for opening, closing in pairs:
+        if not (opening and closing and
+                len(body) >= len(opening) + len(closing) and
+                body.startswith(opening) and body.endswith(closing)):
+            continue
+        if (len(opening) == 1 and len(closing) == 1 and opening != closing and
+                _closing_position(body, opening, closing, escaped) != len(body) - 1):
+            continue
+        return (text[:start] + body[len(opening):len(body) - len(closing)] +
+                text[end:])
+    raise ValueError('the text is not enclosed')
+
+
+def iter_array_to_string(text, escape='none', width=1, byteorder='little',
+                         progress=None):
+    """
+    Like array_to_string, returning the result as a list of pieces like the
+    engine's iter_* functions. The array is parsed by the call, so that
+    ValueError is raised before any piece is used.
+
+    """
+    result = array_to_string(text, escape, width, byteorder)
+    if progress:
+        progress(1.0)
+    return [ result ]
+
+
+def iter_strip_enclosure(text, pairs, quote='"', escape='none', progress=None):
+    """Like strip_enclosure, see iter_array_to_string."""
+    result = strip_enclosure(text, pairs, quote, escape)
+    if progress:
+        progress(1.0)
+    return [ result ]
@@ -34,11 +34,31 @@ StringModWindowHelper
 
 import os
 import re
+import gio
 import gtk
+import gobject
 import gedit
 from gettext import gettext as _
 
-from strmodconf import StringModConfigHelper
+import cache
+import accels
+import config
+import engine
+import bufferops
+import modifiers
+import timing
+from functools import partial
+from worker import TransformJob
+
+# Selections of at least this many characters are modified on a worker thread
+# while the status bar shows the progress
+BACKGROUND_THRESHOLD = 512 * 1024
+
+# Options the menu items are made from
+MENU_OPTIONS = ('Pipelines', 'Templates')
+
+# Worker threads have to be able to run while gtk waits for events
+gobject.threads_init()
 
 # Menu items
 ui_str = """
@@ -54,8 +74,32 @@ ui_str = """
          <separator/>
          <menuitem name="Str2CharArray" action="Str2CharArray"/>
          <menuitem name="Str2WordArray" action="Str2WordArray"/>
+         <menuitem name="Str2ByteArray" action="Str2ByteArray"/>
+         <menuitem name="File2ByteArray" action="File2ByteArray"/>
+         <separator/>
+         <menuitem name="Array2Str" action="Array2Str"/>
+         <menuitem name="StripEnclosure" action="StripEnclosure"/>
+         <separator/>
+         <menu action="StringModPerLine">
+          <menuitem name="BracesPerLine" action="BracesPerLine"/>
+          <menuitem name="BracketsPerLine" action="BracketsPerLine"/>
+          <menuitem name="QuotesPerLine" action="QuotesPerLine"/>
+          <menuitem name="CustomPerLine" action="CustomPerLine"/>
+          <separator/>
+          <menuitem name="Str2CharArrayPerLine" action="Str2CharArrayPerLine"/>
+          <menuitem name="Str2WordArrayPerLine" action="Str2WordArrayPerLine"/>
+          <menuitem name="Str2ByteArrayPerLine" action="Str2ByteArrayPerLine"/>
+          <separator/>
+          <menuitem name="Array2StrPerLine" action="Array2StrPerLine"/>
+          <menuitem name="StripEnclosurePerLine" action="StripEnclosurePerLine"/>
+         </menu>
+         <menuitem name="ApplyToMatches" action="ApplyToMatches"/>
+         <separator/>
+         <placeholder name="StringModPipelines"/>
+         <placeholder name="StringModTemplates"/>
          <separator/>
          <menuitem name="Config" action="Config"/>
+         <menuitem name="Timings" action="Timings"/>
         </menu>
       </placeholder>
     </menu>
@@ -67,18 +111,55 @@ class StringModWindowHelper:
     def __init__(self, plugin, window):
         self._window = window
         self._plugin = plugin
-        self.options = StringModConfigHelper.options
-        self.encl_char = StringModConfigHelper.encl_char
+        self.config = plugin.config
+        self.options = plugin.config.options
+        self.result_cache = plugin.result_cache
+        self.encl_char = modifiers.encl_char
+        # Transformations of the modifiers by name, and the options their
+        # results depend on, set up once per change of the options
+        self._transforms = {}
+        self._result_options = modifiers.result_options(self.options)
+        self._job = None
+        self._stream = None
+        self._timings_panel = None
+        self._match_pattern = ''
+        self._match_modifier = modifiers.names[0]
 
         # Insert menu items
         self._insert_menu()
 
+        self.config.subscribe(self.on_config_changed)
+
     def deactivate(self):
+        # Stop a running modification, its result is not wanted anymore
+        if self._job:
+            self._job.cancel()
+            self._end_job()
+
+        # Finish a running insertion at once, the document must not be left
+        # inside a user action
+        if self._stream:
+            gobject.source_remove(self._stream_source_id)
+            try:
+                for unused in self._stream:
+                    pass
+            except ValueError:
+                # The selected text was put back
+                pass
+            self._end_stream()
+
+        self.config.unsubscribe(self.on_config_changed)
+
+        if self._timings_panel:
+            self._timings_panel.deactivate()
+            self._timings_panel = None
+
         # Remove any installed menu items
         self._remove_menu()
 
         self._window = None
         self._plugin = None
+        self.config = None
         self._action_group = None
 
     def _insert_menu(self):
@@ -88,26 +169,87 @@ class StringModWindowHelper:
         # Create a new action group
         self._action_group = gtk.ActionGroup("StringModPluginActions")
         self._action_group.add_actions([("StringMod", None, _("String Modifiers")),
-            ("Braces", None, _("Add curly braces"), self.options[0],
+            ("Braces", None, _("Add curly braces"), self.config.AccelBraces,
                 _("Add enclosing curly braces to selected text"), self.on_encl_braces_activate),
-            ("Brackets", None, _("Add brackets"), self.options[1],
+            ("Brackets", None, _("Add brackets"), self.config.AccelBrackets,
                 _("Add enclosing brackets to selected text"), self.on_encl_brackets_activate),
-            ("Quotes", None, _("Add quotes"), self.options[2],
+            ("Quotes", None, _("Add quotes"), self.config.AccelQuotes,
                 _("Add enclosing quotes to selected text"), self.on_encl_quotes_activate),
-            ("Custom", None, _("Add custom encl."), self.options[3],
+            ("Custom", None, _("Add custom encl."), self.config.AccelCustom,
                 _("Add custom enclosing chars to selected text"), self.on_encl_custom_activate),
-            ("Str2CharArray", None, _("String to char array"), self.options[4],
+            ("Str2CharArray", None, _("String to char array"), self.config.AccelStr2Array,
                 _("Modify selected text into array of characters"), self.on_make_array_activate),
-            ("Str2WordArray", None, _("String to word array"), self.options[5],
+            ("Str2WordArray", None, _("String to word array"), self.config.AccelStr2WArray,
                 _("Modify selected text into an array of words"), self.on_make_word_array_activate),
+            ("Str2ByteArray", None, _("String to byte array"), self.config.AccelStr2BArray,
+                _("Modify selected text into an array of hex bytes"), self.on_make_byte_array_activate),
+            ("File2ByteArray", None, _("Insert file as byte array..."), None,
+                _("Insert the content of a file as an array of hex bytes"), self.on_insert_file_byte_array_activate),
+            ("Array2Str", None, _("Array to string"), None,
+                _("Modify the array literal of selected text back into a string"), self.on_array_to_string_activate),
+            ("StripEnclosure", None, _("Strip enclosure"), None,
+                _("Remove the enclosing chars of selected text"), self.on_strip_enclosure_activate),
+            ("ApplyToMatches", None, _("Apply to all matches..."), None,
+                _("Apply a modifier to every match of a regular expression"), self.on_apply_to_matches_activate),
             ("Config", None, _("Configure..."), None,
                 _("Configure String Modifiers"), self.on_configure_activate)])
+        self._action_group.add_toggle_actions([("Timings", None, _("Show timings"), None,
+                _("Show the timings of the modifiers in the bottom panel"), self.on_timings_toggled,
+                self._timings_panel is not None)])
+
+        # Per line variants of the modifiers
+        self._action_group.add_actions([("StringModPerLine", None, _("Per line"))] +
+            [(name + modifiers.per_line_suffix, None, modifiers.labels[name], None,
+                _("Modify each line of selected text"), self.on_per_line_activate)
+             for name in modifiers.names])
+
+        # Pipelines defined in the configuration file
+        pipeline_names = self._get_pipeline_names()
+        self._action_group.add_actions(
+            [(modifiers.pipeline_prefix + name, None, name, None,
+                _("Run the pipeline %s on selected text") % name, self.on_pipeline_activate)
+             for name in pipeline_names])
+
+        # Modifiers defined by templates in the configuration file
+        template_names = self._get_template_names()
+        self._action_group.add_actions(
+            [(modifiers.template_prefix + name, None, name, None,
+                _("Modify selected text with the template %s") % name, self.on_template_activate)
+             for name in template_names])
 
         # Insert the action group
         manager.insert_action_group(self._action_group, -1)
 
         # Merge the UI
         self._ui_id = manager.add_ui_from_string(ui_str)
+        for name in pipeline_names:
+            manager.add_ui(self._ui_id,
+                           '/MenuBar/ToolsMenu/ToolsOps_2/StringMod/StringModPipelines',
+                           modifiers.pipeline_prefix + name,
+                           modifiers.pipeline_prefix + name,
+                           gtk.UI_MANAGER_MENUITEM, False)
+        for name in template_names:
+            manager.add_ui(self._ui_id,
+                           '/MenuBar/ToolsMenu/ToolsOps_2/StringMod/StringModTemplates',
+                           modifiers.template_prefix + name,
+                           modifiers.template_prefix + name,
+                           gtk.UI_MANAGER_MENUITEM, False)
+
+    def _get_pipeline_names(self):
+        try:
+            return list(modifiers.pipelines(self.options))
+        except ValueError as error:
+            self._flash_message(_('Invalid pipeline: %s') % error)
+            return []
+
+    def _get_template_names(self):
+        # Compiles the templates, so that the first use of one costs no more
+        # than the next ones
+        try:
+            return list(modifiers.templates(self.options))
+        except (ValueError, re.error) as error:
+            self._flash_message(_('Invalid template: %s') % error)
+            return []
 
     def _remove_menu(self):
         # Get the GtkUIManager
@@ -122,116 +264,459 @@ class StringModWindowHelper:
         # Make sure the manager updates
         manager.ensure_update()
 
-    def update_ui(self):
-        self._action_group.set_sensitive(self._window.get_active_document() != None)
+    def on_config_changed(self, store, changed):
+        self._transforms.clear()
+        self._result_options = modifiers.result_options(self.options)
 
-    def _scrub(self, string):
-        newstr1 = re.sub('^\s*', '', string)
-        newstr2 = re.sub('\s*$', '', newstr1)
-        cleanlist = re.split('[\s,;]+', newstr2)
-        return cleanlist
+        # Menu items of new pipelines and templates, or of renamed ones
+        if set(changed) & set(MENU_OPTIONS):
+            self._remove_menu()
+            self._insert_menu()
+            self.update_ui()
+
+    def update_ui(self):
+        self._action_group.set_sensitive(self._window.get_active_document() != None
+                                         and self._job is None
+                                         and self._stream is None)
 
     def _get_text_selection(self):
         doc = self._window.get_active_document()
 
         # Get selected text, if any, and get the start and end of it
-        if doc.get_has_selection():
-            self._start_iter, self._end_iter = doc.get_selection_bounds()
-            selected_text = doc.get_text(self._start_iter, self._end_iter)
-        else:
-            selected_text = ''
+        selected_text, self._start_iter, self._end_iter = bufferops.get_selection(doc)
 
         return selected_text
 
-    def _replace_text_selection(self, text):
-        doc = self._window.get_active_document()
+    def _replace_text_selection(self, text, doc=None):
+        if doc is None:
+            doc = self._window.get_active_document()
 
-        doc.begin_user_action()
+        bufferops.replace_range(doc, self._start_iter, self._end_iter, text)
 
-        # Delete selected text
-        doc.delete(self._start_iter, self._end_iter)
+    def _enclose_text(self, name, opening_symbol, closing_symbol):
+        doc = self._window.get_active_document()
+        if not doc:
+            return
 
-        # Mark start of new selection
-        start_mark = doc.create_mark(
-            mark_name=None,
-            where=self._start_iter,
-            left_gravity=True)
+        measure = self._plugin.timings.begin(name)
+        measure.time('replace', bufferops.enclose_selection,
+                     doc, opening_symbol, closing_symbol)
+        measure.add('replace', size=len(opening_symbol) + len(closing_symbol))
+        measure.finish()
+
+    def _modify_selection(self, name):
+        """
+        Replace the selected text by the result of the modifier name. The
+        result of larger selections is inserted piece by piece, see
+        _stream_replace, and the largest ones are transformed on a worker
+        thread first, see _start_job. Results of larger selections are kept
+        in the result cache, so that they are not transformed again when the
+        same modifier is applied to the same text.
+
+        """
+        doc = self._window.get_active_document()
+        if not doc:
+            return
 
-        # Insert the new text
-        doc.insert(self._start_iter, text)
+        transform = self._get_transform(name)
+        if not transform:
+            return
 
-        # Move the selection bound to the new text
-        new_start_iter = doc.get_iter_at_mark(start_mark)
-        doc.move_mark_by_name("selection_bound", new_start_iter)
+        measure = self._plugin.timings.begin(name)
+        selected_text = measure.time('get_text', self._get_text_selection)
+        if not selected_text:
+            return
+        measure.add('get_text', size=len(selected_text))
+
+        key = None
+        result = None
+        if len(selected_text) >= bufferops.STREAM_THRESHOLD and self.config.CacheSize:
+            key = measure.time('cache', cache.make_key, name,
+                               self._result_options, selected_text)
+            result = measure.time('cache', self.result_cache.get, key)
+
+        # The reverse modifiers raise ValueError for text they can't parse,
+        # before any piece of their result is used. Other transformations,
+        # e.g. per line, may raise it while their result is streamed, see
+        # _insert_next_slice.
+        try:
+            if result is not None:
+                self._stream_replace(doc, [result], measure)
+            elif len(selected_text) < bufferops.STREAM_THRESHOLD:
+                result = ''.join(measure.time_iter('transform', transform,
+                                                   selected_text))
+                measure.time('replace', self._replace_text_selection, result)
+                measure.add('replace', size=len(result))
+                measure.finish()
+            elif len(selected_text) < BACKGROUND_THRESHOLD:
+                chunks = measure.time_iter('transform', transform, selected_text)
+                if key:
+                    chunks = self.result_cache.iter_put(key, chunks)
+                self._stream_replace(doc, chunks, measure)
+            else:
+                self._start_job(doc, transform, selected_text, key, measure)
+        except ValueError as error:
+            measure.finish()
+            self._flash_message(_('Selection not modified: %s') % error)
+
+    def _stream_replace(self, doc, chunks, measure):
+        """
+        Replace the selected text by the strings of chunks, inserting a
+        bounded slice per idle callback so that the view keeps repainting.
+        The whole replacement is still a single user action, the views of the
+        document are read only until it is done. The slices are measured as
+        the replace phase of measure, which is finished with the stream.
+
+        """
+        self._stream_views = [view for view in self._window.get_views()
+                              if view.get_buffer() == doc and view.get_editable()]
+        for view in self._stream_views:
+            view.set_editable(False)
+
+        self._stream_measure = measure
+        self._stream = bufferops.iter_replace(doc, self._start_iter,
+                                              self._end_iter,
+                                              measure.count_iter('replace', chunks))
+        self._stream_source_id = gobject.idle_add(self._insert_next_slice)
+        self.update_ui()
+
+    def _insert_next_slice(self):
+        try:
+            self._stream_measure.time('replace', next, self._stream)
+        except StopIteration:
+            self._end_stream()
+            self.update_ui()
+            return False
+        except ValueError as error:
+            # The transformation failed half way, the selected text was put
+            # back
+            self._end_stream()
+            self.update_ui()
+            self._flash_message(_('Selection not modified: %s') % error)
+            return False
+        except Exception:
+            # The user action is closed already, make the views editable
+            # again before the error is reported
+            self._end_stream()
+            self.update_ui()
+            raise
+        return True
 
-        doc.end_user_action()
+    def _end_stream(self):
+        for view in self._stream_views:
+            view.set_editable(True)
 
-    def _enclose_text(self, opening_symbol, closing_symbol):
-        doc = self._window.get_active_document()
-        if not doc:
-            return
+        self._stream_measure.finish()
 
-        selected_text = self._get_text_selection()
-        if len(selected_text):
-            self._replace_text_selection("%s%s%s" %
-                (opening_symbol, selected_text, closing_symbol))
+        self._stream = None
+        self._stream_views = None
+        self._stream_measure = None
+
+    def _start_job(self, doc, transform, text, key, measure):
+        # Keep track of the selection and of changes made to the document
+        # while the job runs
+        self._job_doc = doc
+        self._job_key = key
+        self._job_measure = measure
+        self._job_start_mark = doc.create_mark(
+            mark_name=None,
+            where=self._start_iter,
+            left_gravity=True)
+        self._job_end_mark = doc.create_mark(
+            mark_name=None,
+            where=self._end_iter,
+            left_gravity=False)
+        self._job_doc_changed = False
+        self._job_handler_id = doc.connect('changed', self.on_job_doc_changed)
+
+        self._show_job_progress()
+
+        self._job = TransformJob(partial(measure.time_iter, 'transform', transform),
+                                 text,
+                                 self._on_job_progress, self._on_job_done)
+        self.update_ui()
+        self._job.start()
+
+    def _show_job_progress(self):
+        self._job_progress = gtk.ProgressBar()
+        self._job_progress.set_text(_('Modifying selection...'))
+
+        cancel_button = gtk.Button()
+        cancel_button.set_relief(gtk.RELIEF_NONE)
+        cancel_button.set_image(gtk.image_new_from_stock(gtk.STOCK_CANCEL,
+                                                         gtk.ICON_SIZE_MENU))
+        cancel_button.set_tooltip_text(_('Cancel string modification'))
+        cancel_button.connect('clicked', self.on_job_cancel_clicked)
+
+        self._job_box = gtk.HBox(spacing=2)
+        self._job_box.pack_start(self._job_progress, False, False)
+        self._job_box.pack_start(cancel_button, False, False)
+        self._job_box.show_all()
+
+        self._window.get_statusbar().pack_end(self._job_box, False, False)
+
+    def _flash_message(self, message):
+        statusbar = self._window.get_statusbar()
+        statusbar.flash_message(statusbar.get_context_id('StringModifier'),
+                                message)
+
+    def _end_job(self):
+        self._job_doc.disconnect(self._job_handler_id)
+        self._job_doc.delete_mark(self._job_start_mark)
+        self._job_doc.delete_mark(self._job_end_mark)
+        self._job_box.destroy()
+
+        self._job = None
+        self._job_doc = None
+        self._job_key = None
+        self._job_measure = None
+        self._job_box = None
+        self._job_progress = None
+
+    # Worker thread callbacks, they run the actual work on the main loop
+    def _on_job_progress(self, job, fraction):
+        gobject.idle_add(self._update_job_progress, job, fraction)
+
+    def _on_job_done(self, job, result):
+        gobject.idle_add(self._finish_job, job, result)
+
+    def _update_job_progress(self, job, fraction):
+        if job is self._job:
+            self._job_progress.set_fraction(fraction)
+        return False
+
+    def _finish_job(self, job, result):
+        # The job may have been stopped by deactivate meanwhile
+        if job is not self._job:
+            return False
+
+        doc = self._job_doc
+        if result is not None and self._job_key:
+            # The result is valid for the text of the selection even if the
+            # document was changed meanwhile
+            self.result_cache.put(self._job_key, result)
+
+        if isinstance(job.error, ValueError):
+            self._flash_message(_('Selection not modified: %s') % job.error)
+        elif job.error:
+            self._flash_message(_('String modification failed: %s') % job.error)
+        elif result is None:
+            self._flash_message(_('String modification cancelled'))
+        elif self._job_doc_changed or doc not in self._window.get_documents():
+            self._flash_message(
+                _('Document changed during string modification, result discarded'))
+        else:
+            self._start_iter = doc.get_iter_at_mark(self._job_start_mark)
+            self._end_iter = doc.get_iter_at_mark(self._job_end_mark)
+            # Marks have to go before the selection is replaced
+            measure = self._job_measure
+            self._end_job()
+            self._stream_replace(doc, [result], measure)
+            return False
+
+        self._job_measure.finish()
+        self._end_job()
+        self.update_ui()
+        return False
 
     # Menu activate handlers
     def on_configure_activate(self, action):
         self._plugin.create_configure_dialog()
 
+    def on_timings_toggled(self, action):
+        # The panel is rarely used, so its module is only loaded when it is
+        # first shown
+        if action.get_active() and not self._timings_panel:
+            from strmodpanel import StringModTimingsPanel
+            self._timings_panel = StringModTimingsPanel(self._window,
+                                                        self._plugin.timings,
+                                                        self._flash_message)
+        elif not action.get_active() and self._timings_panel:
+            self._timings_panel.deactivate()
+            self._timings_panel = None
+
     def on_encl_braces_activate(self, action):
-        self._enclose_text('{', '}')
+        self._enclose_text('Braces', '{', '}')
 
     def on_encl_brackets_activate(self, action):
-        self._enclose_text('[', ']')
+        self._enclose_text('Brackets', '[', ']')
 
     def on_encl_quotes_activate(self, action):
-        self._enclose_text('"', '"')
+        if not self.config.EscapeMode:
+            self._enclose_text('Quotes', '"', '"')
+        else:
+            # The quoted text is escaped, so it has to be replaced
+            self._modify_selection('Quotes')
 
     def on_encl_custom_activate(self, action):
-        self._enclose_text(self.options[6], self.options[7])
+        self._enclose_text('Custom', self.config.CustomStart,
+                           self.config.CustomEnd)
+
+    def on_job_cancel_clicked(self, button):
+        if self._job:
+            self._job.cancel()
+
+    def on_job_doc_changed(self, doc):
+        self._job_doc_changed = True
+
+    def _get_transform(self, name):
+        # The transformation is set up on first use after the options
+        # changed. The configuration may hold an invalid regular expression
+        # or pipeline, or no longer define the pipeline or template name.
+        try:
+            return self._transforms[name]
+        except KeyError:
+            pass
+        try:
+            transform = modifiers.get_transform(name, self.options)
+        except re.error as error:
+            self._flash_message(_('Invalid regular expression: %s') % error)
+            return None
+        except ValueError as error:
+            self._flash_message(_('Invalid pipeline or template: %s') % error)
+            return None
+        except KeyError:
+            self._flash_message(_('Unknown modifier %s') % name)
+            return None
+        self._transforms[name] = transform
+        return transform
 
     def on_make_array_activate(self, action):
+        self._modify_selection('Str2CharArray')
+
+    def on_make_word_array_activate(self, action):
+        self._modify_selection('Str2WordArray')
+
+    def on_make_byte_array_activate(self, action):
+        self._modify_selection('Str2ByteArray')
+
+    def on_array_to_string_activate(self, action):
+        self._modify_selection('Array2Str')
+
+    def on_strip_enclosure_activate(self, action):
+        self._modify_selection('StripEnclosure')
+
+    def on_per_line_activate(self, action):
+        self._modify_selection(action.get_name())
+
+    def on_pipeline_activate(self, action):
+        self._modify_selection(action.get_name())
+
+    def on_template_activate(self, action):
+        self._modify_selection(action.get_name())
+
+    def on_insert_file_byte_array_activate(self, action):
         doc = self._window.get_active_document()
         if not doc:
             return
 
-        selected_text = self._get_text_selection()
-        if selected_text:
-            encl_type = int(self.options[8])
-            text_length = len(selected_text)
-            char_count = 1
-            new_string = "%c " % self.encl_char[encl_type][0]
-            for charset in selected_text:
-                if char_count < text_length:
-                    new_string += ("'%c', " % charset)
-                else:
-                    new_string += ("'%c'" % charset)
-                char_count += 1
-
-            new_string += " %c" % self.encl_char[encl_type][1]
-            self._replace_text_selection(new_string)
+        chooser = gtk.FileChooserDialog(_('Insert File as Byte Array'),
+                                        self._window,
+                                        gtk.FILE_CHOOSER_ACTION_OPEN,
+                                        (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL,
+                                         gtk.STOCK_OPEN, gtk.RESPONSE_OK))
+        chooser.set_default_response(gtk.RESPONSE_OK)
+        if chooser.run() == gtk.RESPONSE_OK:
+            file_name = chooser.get_filename()
+        else:
+            file_name = None
+        chooser.destroy()
+
+        if not file_name:
+            return
+        if not os.access(file_name, os.R_OK):
+            self._flash_message(_('Cannot read %s') % file_name)
+            return
 
-    def on_make_word_array_activate(self, action):
+        # Replace the selected text, if any, or insert at the cursor. The
+        # file is read while its array is inserted.
+        if doc.get_has_selection():
+            self._start_iter, self._end_iter = doc.get_selection_bounds()
+        else:
+            self._start_iter = doc.get_iter_at_mark(doc.get_insert())
+            self._end_iter = self._start_iter.copy()
+        measure = self._plugin.timings.begin('File2ByteArray')
+        self._stream_replace(doc, measure.time_iter(
+            'transform', engine.iter_file_byte_array,
+            file_name, **modifiers.byte_array_options(self.options)), measure)
+
+    def _run_match_dialog(self):
+        # Ask for the regular expression and the modifier to apply, return
+        # them as a tuple or None when cancelled
+        dialog = gtk.Dialog(_('Apply to All Matches'), self._window,
+                            gtk.DIALOG_MODAL | gtk.DIALOG_DESTROY_WITH_PARENT,
+                            (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL,
+                             gtk.STOCK_APPLY, gtk.RESPONSE_OK))
+        dialog.set_default_response(gtk.RESPONSE_OK)
+
+        pattern_entry = gtk.Entry()
+        pattern_entry.set_text(self._match_pattern)
+        pattern_entry.set_activates_default(True)
+
+        modifier_combo = gtk.combo_box_new_text()
+        for name in modifiers.names:
+            modifier_combo.append_text(modifiers.labels[name])
+        modifier_combo.set_active(modifiers.names.index(self._match_modifier))
+
+        table = gtk.Table(2, 2)
+        table.set_border_width(5)
+        table.set_row_spacings(4)
+        table.set_col_spacings(6)
+        table.attach(gtk.Label(_('Regular expression:')), 0, 1, 0, 1, gtk.FILL)
+        table.attach(pattern_entry, 1, 2, 0, 1)
+        table.attach(gtk.Label(_('Modifier:')), 0, 1, 1, 2, gtk.FILL)
+        table.attach(modifier_combo, 1, 2, 1, 2)
+        table.show_all()
+        dialog.vbox.pack_start(table)
+
+        if dialog.run() == gtk.RESPONSE_OK:
+            result = (pattern_entry.get_text(),
+                      modifiers.names[modifier_combo.get_active()])
+        else:
+            result = None
+        dialog.destroy()
+        return result
+
+    def on_apply_to_matches_activate(self, action):
         doc = self._window.get_active_document()
         if not doc:
             return
 
-        selected_text = self._get_text_selection()
-        if selected_text:
-            encl_type = int(self.options[9])
-            words = self._scrub(selected_text)
-            word_count = len(words) - 1
-            new_string = "%c " % self.encl_char[encl_type][0]
-            for index, word in enumerate(words):
-                if index < word_count:
-                    new_string += ("'%s', " % word)
-                else:
-                    new_string += ("'%s'" % word)
+        result = self._run_match_dialog()
+        if not result or not result[0]:
+            return
+        self._match_pattern, self._match_modifier = result
 
-            new_string += " %c" % self.encl_char[encl_type][1]
-            self._replace_text_selection(new_string)
+        try:
+            pattern = re.compile(self._match_pattern.decode('utf-8'), re.MULTILINE)
+        except re.error as error:
+            self._flash_message(_('Invalid regular expression: %s') % error)
+            return
+
+        transform = self._get_transform(self._match_modifier)
+        if not transform:
+            return
+
+        # Match on the decoded text so that the match positions are character
+        # offsets, as used by the document; modifiers work on utf-8 strings
+        def modify(matched_text):
+            return ''.join(transform(matched_text.encode('utf-8')))
+
+        measure = self._plugin.timings.begin('ApplyToMatches')
+        text = measure.time('get_text', doc.get_text, *doc.get_bounds())
+        measure.add('get_text', size=len(text))
+        text = text.decode('utf-8')
+        try:
+            replacements = measure.time('transform', engine.find_replacements,
+                                        text, pattern, modify)
+        except ValueError as error:
+            measure.finish()
+            self._flash_message(_('Matches not modified: %s') % error)
+            return
+        if replacements:
+            measure.time('replace', bufferops.replace_ranges, doc, replacements)
+        measure.finish()
+        self._flash_message(_('%d matches modified') % len(replacements))
 
 
 class StringModPlugin(gedit.Plugin):
@@ -246,22 +731,103 @@ class StringModPlugin(gedit.Plugin):
         self._instances = {}
         self.plugin_path = None
         self.config_ui = None
+        self._config_monitor = None
+
+        # Options and results of the modifiers, shared by all windows and
+        # the configuration window
+        self.config = config.ConfigStore()
+        self.result_cache = cache.ResultCache(modifiers.cache_budget(self.config.options))
+        self.config.subscribe(self.on_config_changed)
+
+        # Timings of the modifications of all windows, see strmodpanel
+        self.timings = timing.Recorder()
 
     def activate(self, window):
         self._window = window
         self.plugin_path = os.path.dirname(os.path.realpath(__file__))
+
+        if self._config_monitor is None:
+            # The menu holds the pipelines and templates of the configuration
+            # file. Changes of the file by other gedit processes are read
+            # when they are done.
+            self.config.file_name = os.path.join(self.plugin_path,
+                                                 config.CONFIG_FILE_NAME)
+            self.load_config()
+            self._config_monitor = gio.File(self.config.file_name).monitor_file()
+            self._config_monitor.connect('changed', self.on_config_file_changed)
+
         self._instances[window] = StringModWindowHelper(self, window)
 
     def deactivate(self, window):
         self._instances[window].deactivate()
         del self._instances[window]
 
+        if not self._instances:
+            if self.config_ui:
+                self.config_ui.dialog.destroy()
+            self._config_monitor.cancel()
+            self._config_monitor = None
+
+    def load_config(self):
+        """
+        Read the configuration file into the options, unless it was not
+        changed since it was last read or written. Return the names of the
+        options which changed.
+
+        """
+        return self.config.load()
+
+    def on_config_file_changed(self, monitor, config_file, other_file, event):
+        # The file is replaced at once when it is written (see
+        # config.write_config), which may be seen as its creation
+        if event not in (gio.FILE_MONITOR_EVENT_CHANGES_DONE_HINT,
+                         gio.FILE_MONITOR_EVENT_CREATED):
+            return
+        try:
+            self.load_config()
+        except (IOError, ValueError):
+            # Keep the current options, the next change may fix the file
+            pass
+
+    def on_config_changed(self, store, changed):
+        if 'CacheSize' in changed:
+            self.result_cache.set_budget(modifiers.cache_budget(store.options))
+
+        # Accelerators are shared by the actions of all windows. They never
+        # take the keys of another action, e.g. from a hand edited
+        # configuration file; the old ones are released first, so that
+        # actions can swap their keys.
+        changed_actions = [ (index, action)
+                            for index, action in enumerate(accels.ACCEL_ACTIONS)
+                            if modifiers.option_names[index] in changed ]
+        for index, action in changed_actions:
+            gtk.accel_map_change_entry(accels.action_path(action), 0, 0, False)
+        for index, action in changed_actions:
+            accel_value = gtk.accelerator_parse(store.options[index])
+            if not accel_value[0]:
+                continue
+            if not gtk.accel_map_change_entry(accels.action_path(action),
+                                              accel_value[0], accel_value[1], False):
+                self._flash_message(_('Shortcut %s of %s not set, it is already in use') %
+                                    (store.options[index], modifiers.labels[action]))
+
+    def _flash_message(self, message):
+        if self._window:
+            statusbar = self._window.get_statusbar()
+            statusbar.flash_message(statusbar.get_context_id('StringModifier'),
+                                    message)
+
     def is_configurable(self):
         return True
 
     def create_configure_dialog(self):
+        # The configuration window is rarely opened, so its module and its
+        # gtk.Builder are only loaded the first time, and the window is
+        # kept for the next times
         if not self.config_ui:
-            self.config_ui = StringModConfigHelper(self, self._window)
+            from strmodconf import StringModConfigHelper
+            self.config_ui = StringModConfigHelper(self)
+        self.config_ui.show(self._window)
         return self.config_ui.dialog
 
     def update_ui(self, window):
@@ -21,155 +21,283 @@
 2010-12-01  for String Modifiers plugin version 1.0
 
 This module provides dialog box for configuring String Modifiers plugin.
+It is only imported when the dialog is first opened; the dialog is then
+hidden instead of destroyed, and shown again the next times.
 
 """
 
 import os
-import re
 import sys
 import gtk
 from gettext import gettext as _
 
+import accels
+import engine
+import modifiers
+
 class StringModConfigHelper:
 
     """
     Configuration file:
     -------------------
     |    Accelerators = [ 'AccelBraces', 'AccelBrackets', 'AccelQuotes',
-    |                     'AccelCustom', 'AccelStr2Array', 'AccelStr2WArray' ]
+    |                     'AccelCustom', 'AccelStr2Array', 'AccelStr2WArray',
+    |                     'AccelStr2BArray' ]
     |
     |    Custom enclosures = [ 'CustomStart', 'CustomEnd' ]
     |
-    |    String to Arrary enclodsure choice = [ 'RadioCharArray', 'RadioWordArray' ]
+    |    String to Arrary enclodsure choice = [ 'RadioCharArray', 'RadioWordArray',
+    |                                          'RadioByteArray' ]
+    |
+    |    Byte array elements = [ 'RadioByteWidth', 'RadioByteOrder' ]
+    |
+    |    Array wrapping = [ 'WrapArray', 'WrapColumn', 'WrapCount', 'WrapIndent' ]
+    |
+    |    Word separators = [ 'WordTokenizer', 'WordPattern' ]
+    |
+    |    Pipelines = [ 'Pipelines' ], e.g.
+    |        Pipelines=ParenWords: words | unique | quote | enclose(paren)
+    |
+    |    Templates = [ 'Templates' ], e.g.
+    |        Templates=Enum: each="  {}," sep="\\n" prefix="enum {\\n" suffix="\\n};"
+    |
+    |    Escaping of quoted text = [ 'EscapeMode' ]
+    |
+    |    Char array elements = [ 'CharUnit' ]
+    |
+    |    Word array words = [ 'WordUnique', 'WordSort', 'WordCount' ]
+    |
+    |    Result cache = [ 'CacheSize' ], in megabytes
     -------------------
 
-    The configuration then parsed into options list
+    The configuration then parsed into the options list of the plugin, in
+    the order of option_names (see modifiers module). Entries missing from
+    the file keep their default value. The file is only parsed again when it
+    was changed since it was last read or written.
 
     """
 
-    options = [ '', '', '', '', '', '', '"', '"', 0, 0 ]
-    
-    encl_char = (('{', '}'), ('[', ']'), ('(', ')'))
+    encl_char = modifiers.encl_char
     
     widget_names = [ 'AccelBraces', 'AccelBrackets', 'AccelQuotes', 'AccelCustom',
-                     'AccelStr2Array', 'AccelStr2WArray', 'CustomStart', 'CustomEnd' ]
-    
-    radio_char_names = [ 'RadioCharArray1', 'RadioCharArray2', 'RadioCharArray3' ]
-    
-    radio_word_names = [ 'RadioWordArray1', 'RadioWordArray2', 'RadioWordArray3' ]
-    
-    widget_objects = []
-    widget_values = []
-    radio_char_objects = []
-    radio_word_objects = []
+                     'AccelStr2Array', 'AccelStr2WArray', 'AccelStr2BArray',
+                     'CustomStart', 'CustomEnd' ]
 
-    action_path = '<Actions>/StringModPluginActions/'
-    action_list = [ 'Braces', 'Brackets', 'Quotes', 'Custom', 
-                    'Str2CharArray', 'Str2WordArray' ]
+    # Radio button groups, the index of the active button is the option value
+    radio_group_names = [ 'RadioCharArray', 'RadioWordArray', 'RadioByteArray',
+                          'RadioByteWidth', 'RadioByteOrder' ]
 
+    radio_names = [ [ 'RadioCharArray1', 'RadioCharArray2', 'RadioCharArray3' ],
+                    [ 'RadioWordArray1', 'RadioWordArray2', 'RadioWordArray3' ],
+                    [ 'RadioByteArray1', 'RadioByteArray2', 'RadioByteArray3' ],
+                    [ 'RadioByteWidth1', 'RadioByteWidth2', 'RadioByteWidth3' ],
+                    [ 'RadioByteOrder1', 'RadioByteOrder2' ] ]
 
-    def __init__(self, plugin, window):
-        self._window = window
-        self._plugin = plugin
+    spin_names = [ 'WrapColumn', 'WrapCount', 'WrapIndent' ]
 
-        self.RadioCharArray = 0
-        self.RadioWordArray = 0
+    option_names = modifiers.option_names
 
-        self.Accelerator = ''
-        self.OldAccel = ''
-        self.accel_index = None
 
-        self._parse_config_file()
+    def __init__(self, plugin):
+        self._window = None
+        self._plugin = plugin
+        self.config = plugin.config
+        self.options = plugin.config.options
+        self.result_cache = plugin.result_cache
+
+        self.widget_objects = []
+        self.widget_values = []
+        self.radio_objects = []
+        self.spin_objects = []
+        self.radio_values = [ 0 ] * len(self.radio_group_names)
+        self.WrapArray = 0
 
         glade_file = os.path.join(self._plugin.plugin_path, 'strmodconf.glade')
         self.builder = gtk.Builder()
         self.builder.add_from_file(glade_file)
         self.dialog = self.builder.get_object("maindialog")
         self._get_dialog_widgets_objects()
-        self._set_dialog_widgets_from_options_values()
         self.builder.connect_signals(self)
-        self.dialog.set_transient_for(self._window)
         self.dialog.set_position(gtk.WIN_POS_CENTER_ON_PARENT)
-        self.dialog.show()
 
-    def _parse_config_file(self):
-        self.config_file_name = os.path.join(self._plugin.plugin_path, 'stringmod.cfg')
-        if os.path.exists(self.config_file_name):
-            # Set global options from config file entries
-            index = 0
-            for line in open(self.config_file_name):
-                params = self._split(line)
-                if index < len(self.widget_names):
-                    self.options[index] = params[1]
-                else:
-                    self.options[index] = int(params[1])
-                index += 1
-        else:
-            self._set_config_file()
+    def show(self, window):
+        """Show the dialog over window, with the current configuration."""
+        self._window = window
 
-    def _set_config_file(self):
-        self.conf_file = open(self.config_file_name, 'wb')
-        for index, name in enumerate(self.widget_names):
-            self.conf_file.write("%s=%s\n" % (name, self.options[index]))
+        self.Accelerator = ''
+        self.OldAccel = ''
+        self.accel_index = None
 
-        index += 1
-        self.conf_file.write("RadioCharArray=%s\n" % str(self.options[index]))
-        index += 1
-        self.conf_file.write("RadioWordArray=%s\n" % str(self.options[index]))
-        self.conf_file.close()
+        self._parse_config_file()
+        self._build_accel_registry()
+        self._set_dialog_widgets_from_options_values()
+        self.dialog.set_transient_for(self._window)
+        self.dialog.present()
 
-    def _split(self, string):
-        newstr = re.sub('\s$', '', string)
-        cleanlist = re.split('=', newstr)
-        return cleanlist
+    def _parse_config_file(self):
+        # Set global options from config file entries, if it was changed
+        if os.path.exists(self.config.file_name):
+            self._plugin.load_config()
+        else:
+            self.config.save()
+
+    def _build_accel_registry(self):
+        # Index the accelerators of all actions once, those of the plugin as
+        # in the configuration; they are then updated as they are entered
+        entries = []
+        gtk.accel_map_foreach(lambda data, path, keyval, mods, changed:
+                              entries.append((path,) + self._accel_key(keyval, mods)))
+        self.accel_registry = accels.AccelRegistry(entries)
+        for index, action in enumerate(accels.ACCEL_ACTIONS):
+            keyval, mods = gtk.accelerator_parse(self.options[index])
+            self.accel_registry.assign(accels.action_path(action),
+                                       *self._accel_key(keyval, mods))
+
+    def _accel_key(self, keyval, mods):
+        # Accelerators match whatever the case of their key
+        return (gtk.gdk.keyval_to_lower(keyval),
+                int(mods & gtk.accelerator_get_default_mod_mask()))
 
     def _get_dialog_widgets_objects(self):
         for widget in self.widget_names:
             widget_object = self.builder.get_object(widget)
             self.widget_objects.append(widget_object)
 
-        for radio_char in self.radio_char_names:
-            radio_char_object = self.builder.get_object(radio_char)
-            self.radio_char_objects.append(radio_char_object)
-
-        for radio_word in self.radio_word_names:
-            radio_word_object = self.builder.get_object(radio_word)
-            self.radio_word_objects.append(radio_word_object)
+        for radio_group in self.radio_names:
+            radio_group_objects = []
+            for radio in radio_group:
+                radio_object = self.builder.get_object(radio)
+                radio_group_objects.append(radio_object)
+            self.radio_objects.append(radio_group_objects)
+
+        self.wrap_check_object = self.builder.get_object('WrapArray')
+
+        for spin in self.spin_names:
+            spin_object = self.builder.get_object(spin)
+            self.spin_objects.append(spin_object)
+
+        self.tokenizer_combo_object = self.builder.get_object('WordTokenizer')
+        self.pattern_entry_object = self.builder.get_object('WordPattern')
+        self.escape_combo_object = self.builder.get_object('EscapeMode')
+        self.char_unit_combo_object = self.builder.get_object('CharUnit')
+        self.word_sort_combo_object = self.builder.get_object('WordSort')
+        self.word_unique_check_object = self.builder.get_object('WordUnique')
+        self.word_count_check_object = self.builder.get_object('WordCount')
+        self.cache_size_spin_object = self.builder.get_object('CacheSize')
+        self.cache_stats_label_object = self.builder.get_object('CacheStats')
 
     def _get_dialog_widgets_values(self):
-        for widget_object in self.widget_objects:
-            widget_value = widget_object.get_text()
-            self.widget_values.append(widget_value)
+        self.widget_values = [ widget_object.get_text()
+                               for widget_object in self.widget_objects ]
 
     def _set_dialog_widgets_from_options_values(self):
         for index, widget_object in enumerate(self.widget_objects):
             widget_object.set_text(self.options[index])
 
+        for group, radio_group_objects in enumerate(self.radio_objects):
+            index += 1
+            radio_group_objects[self.options[index]].set_active(True)
+            self.radio_values[group] = self.options[index]
+
         index += 1
-        self.radio_char_objects[self.options[index]].set_active(True)
-        self.RadioCharArray = self.options[index]
-        index += 1
-        self.radio_word_objects[self.options[index]].set_active(True)
-        self.RadioWordArray = self.options[index]
+        self.wrap_check_object.set_active(bool(self.options[index]))
+        self.WrapArray = self.options[index]
+        self._set_wrap_widgets_sensitive()
 
-    def _set_options_from_widgets_values(self):
-        for index, value in enumerate(self.widget_values):
-            self.options[index] = value
+        for spin_object in self.spin_objects:
+            index += 1
+            spin_object.set_value(self.options[index])
 
         index += 1
-        self.options[index] = self.RadioCharArray
+        self.tokenizer_combo_object.set_active(self.options[index])
         index += 1
-        self.options[index] = self.RadioWordArray
+        self.pattern_entry_object.set_text(self.options[index])
+        self._set_pattern_widget_sensitive()
+
+        self.escape_combo_object.set_active(
+            self.options[modifiers.option_index['EscapeMode']])
+        self.char_unit_combo_object.set_active(
+            self.options[modifiers.option_index['CharUnit']])
+        self.word_unique_check_object.set_active(
+            bool(self.options[modifiers.option_index['WordUnique']]))
+        self.word_sort_combo_object.set_active(
+            self.options[modifiers.option_index['WordSort']])
+        self.word_count_check_object.set_active(
+            bool(self.options[modifiers.option_index['WordCount']]))
+        self.cache_size_spin_object.set_value(
+            self.options[modifiers.option_index['CacheSize']])
+        self._set_cache_stats_label()
+
+    def _get_options_from_widgets_values(self):
+        options = list(self.options)
+        for index, value in enumerate(self.widget_values):
+            options[index] = value
+
+        for radio_value in self.radio_values:
+            index += 1
+            options[index] = radio_value
 
-    def on_radio_char_toggled(self, widget, data=None):
-        for index, radio_object in enumerate(self.radio_char_objects):
-            if widget == radio_object:
-                self.RadioCharArray = index
+        index += 1
+        options[index] = self.WrapArray
 
-    def on_radio_word_toggled(self, widget, data=None):
-        for index, radio_object in enumerate(self.radio_word_objects):
-            if widget == radio_object:
-                self.RadioWordArray = index
+        for spin_object in self.spin_objects:
+            index += 1
+            options[index] = spin_object.get_value_as_int()
+
+        index += 1
+        options[index] = self.tokenizer_combo_object.get_active()
+        index += 1
+        options[index] = self.pattern_entry_object.get_text()
+
+        escape_index = modifiers.option_index['EscapeMode']
+        options[escape_index] = self.escape_combo_object.get_active()
+        char_unit_index = modifiers.option_index['CharUnit']
+        options[char_unit_index] = self.char_unit_combo_object.get_active()
+        word_unique_index = modifiers.option_index['WordUnique']
+        options[word_unique_index] = int(self.word_unique_check_object.get_active())
+        word_sort_index = modifiers.option_index['WordSort']
+        options[word_sort_index] = self.word_sort_combo_object.get_active()
+        word_count_index = modifiers.option_index['WordCount']
+        options[word_count_index] = int(self.word_count_check_object.get_active())
+        cache_size_index = modifiers.option_index['CacheSize']
+        options[cache_size_index] = self.cache_size_spin_object.get_value_as_int()
+        return options
+
+    def _set_wrap_widgets_sensitive(self):
+        for spin_object in self.spin_objects:
+            spin_object.set_sensitive(bool(self.WrapArray))
+
+    def _set_pattern_widget_sensitive(self):
+        # The regular expression is only used by the custom tokenizer
+        self.pattern_entry_object.set_sensitive(
+            self.tokenizer_combo_object.get_active() == len(engine.TOKENIZERS) - 1)
+
+    def _set_cache_stats_label(self):
+        result_cache = self.result_cache
+        self.cache_stats_label_object.set_text(
+            _('%d hits, %d misses, %d results in %.1f MB') %
+            (result_cache.hits, result_cache.misses, len(result_cache),
+             result_cache.size / (1024.0 * 1024.0)))
+
+    def on_cache_clear_clicked(self, widget, data=None):
+        self.result_cache.clear()
+        self._set_cache_stats_label()
+
+    def on_tokenizer_changed(self, widget, data=None):
+        self._set_pattern_widget_sensitive()
+
+    def on_radio_toggled(self, widget, data=None):
+        if not widget.get_active():
+            return
+
+        for group, radio_group_objects in enumerate(self.radio_objects):
+            for index, radio_object in enumerate(radio_group_objects):
+                if widget == radio_object:
+                    self.radio_values[group] = index
+
+    def on_wrap_toggled(self, widget, data=None):
+        self.WrapArray = int(widget.get_active())
+        self._set_wrap_widgets_sensitive()
 
     def on_in_focus_event(self, widget, data=None):
         for index, accelerator in enumerate(self.widget_objects):
@@ -184,26 +312,24 @@ class StringModConfigHelper:
 
     def on_focus_out_event(self, widget, data=None):
         gtk.gdk.keyboard_ungrab()
-        if not self.Accelerator:
-            widget.set_text(self.OldAccel)
+        # The entry may still tell which action uses the last keys pressed
+        widget.set_text(self.Accelerator or self.OldAccel)
         self.Accelerator = ''
         self.accel_index = None
 
-    def _is_valid_accel(self, keyval, mod):
-        accel_path = self.action_path + self.action_list[self.accel_index]
-        old_accel = gtk.accel_map_lookup_entry(accel_path)
-        if not gtk.accel_map_change_entry(accel_path, keyval, mod, False):
-            msgdlg = gtk.MessageDialog(self.dialog,
-                                       gtk.DIALOG_MODAL,
-                                       gtk.MESSAGE_ERROR,
-                                       gtk.BUTTONS_OK,
-                                       _('Shortcut %s is already in use') % gtk.accelerator_name(keyval, mod))
-            msgdlg.run()
-            msgdlg.destroy()
-            return False
-        else:
-            gtk.accel_map_change_entry(accel_path, old_accel[0], old_accel[1], True)
-            return True
+    def _set_accel(self, widget, keyval, mod):
+        # Take the accelerator for the edited action, unless another action
+        # uses it; the entry then tells which one, until the next key press
+        accel_path = accels.action_path(accels.ACCEL_ACTIONS[self.accel_index])
+        accel_key = self._accel_key(keyval, mod)
+        owner = self.accel_registry.owner(accel_key[0], accel_key[1], accel_path)
+        if owner:
+            widget.set_text(_('%s is used by %s') % (gtk.accelerator_name(keyval, mod),
+                                                     accels.action_name(owner)))
+            return
+        self.accel_registry.assign(accel_path, *accel_key)
+        self.Accelerator = gtk.accelerator_name(keyval, mod)
+        widget.set_text(self.Accelerator)
 
     def on_key_press_event(self, widget, event):
         mask = event.state & gtk.accelerator_get_default_mod_mask()
@@ -214,43 +340,42 @@ class StringModConfigHelper:
         elif event.keyval in (gtk.keysyms.Delete, gtk.keysyms.BackSpace):
             self.OldAccel = ''
             self.Accelerator = ''
+            self.accel_registry.remove(
+                accels.action_path(accels.ACCEL_ACTIONS[self.accel_index]))
             widget.set_text(self.Accelerator)
             return True
         elif event.keyval in range(gtk.keysyms.F1, gtk.keysyms.F12 + 1):
-            if self._is_valid_accel(event.keyval, mask):
-                self.Accelerator = gtk.accelerator_name(event.keyval, mask)
-                widget.set_text(self.Accelerator)
-                return True
+            self._set_accel(widget, event.keyval, mask)
+            return True
         elif gtk.gdk.keyval_to_unicode(event.keyval):
             if mask:
-                if self._is_valid_accel(event.keyval, mask):
-                    self.Accelerator = gtk.accelerator_name(event.keyval, mask)
-                    widget.set_text(self.Accelerator)
-                    return True
+                self._set_accel(widget, event.keyval, mask)
+                return True
         else:
             return False
 
     def on_ok_click(self, event):
         self._get_dialog_widgets_values()
-        self._set_options_from_widgets_values()
-
-        # Reconfigure accel keys on menu
-        for index, action in enumerate(self.action_list):
-            accel_value = gtk.accelerator_parse(self.options[index])
-            accel_path = self.action_path + action
-            gtk.accel_map_change_entry(accel_path, accel_value[0], accel_value[1], False)
 
-        self._set_config_file()
-        self.dialog.destroy()
+        # The plugin and its windows are told about the changes, e.g. to
+        # reconfigure accel keys on menu
+        self.config.set_options(self._get_options_from_widgets_values())
+        self.config.save()
+        self.dialog.hide()
 
     def on_cancel_click(self, event):
-        self.dialog.destroy()
+        self.dialog.hide()
+
+    def on_delete_event(self, widget, event):
+        # Keep the dialog for the next time
+        self.dialog.hide()
+        return True
 
     def deactivate(self, event=None):
-        del self.widget_objects[:]
-        del self.widget_values[:]
-        del self.radio_char_objects[:]
-        del self.radio_word_objects[:]
+        self.widget_objects = []
+        self.widget_values = []
+        self.radio_objects = []
+        self.spin_objects = []
 
         self._plugin.config_ui = None
         self._window = None
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+#  Timings panel of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module provides the debug panel showing the timings of the modifiers
+(see timing.Recorder) in the bottom panel of a gedit window. Like the
+configuration dialog, it is only imported when it is first shown.
+
+"""
+
+import gtk
+import gobject
+from gettext import gettext as _
+
+# Columns of the summary list
+(COLUMN_NAME, COLUMN_PHASE, COLUMN_CALLS, COLUMN_TOTAL, COLUMN_MEAN,
+ COLUMN_MAX, COLUMN_BYTES) = range(7)
+
+class StringModTimingsPanel:
+
+    """
+    Summary of the kept timings, by modifier and phase, with buttons to turn
+    measuring on or off, to clear the timings and to export them as JSON.
+    The timings are shared by all windows, each window has a panel of its
+    own.
+
+    """
+
+    def __init__(self, window, recorder, flash_message):
+        self._window = window
+        self._recorder = recorder
+        self._flash_message = flash_message
+
+        self._store = gtk.ListStore(str, str, gobject.TYPE_INT64, str, str,
+                                    str, gobject.TYPE_INT64)
+        view = gtk.TreeView(self._store)
+        for column, title in ((COLUMN_NAME, _('Modifier')),
+                              (COLUMN_PHASE, _('Phase')),
+                              (COLUMN_CALLS, _('Calls')),
+                              (COLUMN_TOTAL, _('Total (ms)')),
+                              (COLUMN_MEAN, _('Mean (ms)')),
+                              (COLUMN_MAX, _('Max (ms)')),
+                              (COLUMN_BYTES, _('Bytes'))):
+            renderer = gtk.CellRendererText()
+            if column not in (COLUMN_NAME, COLUMN_PHASE):
+                renderer.set_property('xalign', 1.0)
+            view.append_column(gtk.TreeViewColumn(title, renderer, text=column))
+
+        scrolled = gtk.ScrolledWindow()
+        scrolled.set_policy(gtk.POLICY_AUTOMATIC, gtk.POLICY_AUTOMATIC)
+        scrolled.set_shadow_type(gtk.SHADOW_IN)
+        scrolled.add(view)
+
+        self._record_button = gtk.CheckButton(_('Measure modifiers'))
+        self._record_button.set_tooltip_text(
+            _('Measure the phases of the modifications, in all windows'))
+        self._record_handler_id = self._record_button.connect(
+            'toggled', self.on_record_toggled)
+
+        clear_button = gtk.Button(stock=gtk.STOCK_CLEAR)
+        clear_button.connect('clicked', self.on_clear_clicked)
+
+        export_button = gtk.Button(_('Export...'))
+        export_button.set_tooltip_text(_('Save the timings as JSON'))
+        export_button.connect('clicked', self.on_export_clicked)
+
+        buttons = gtk.VButtonBox()
+        buttons.set_layout(gtk.BUTTONBOX_START)
+        buttons.set_spacing(4)
+        buttons.pack_start(self._record_button)
+        buttons.pack_start(clear_button)
+        buttons.pack_start(export_button)
+
+        self.widget = gtk.HBox(spacing=6)
+        self.widget.set_border_width(4)
+        self.widget.pack_start(scrolled)
+        self.widget.pack_start(buttons, False, False)
+        self.widget.show_all()
+
+        self._update()
+        self._recorder.subscribe(self.on_timings_changed)
+
+        panel = self._window.get_bottom_panel()
+        panel.add_item(self.widget, _('String Modifiers Timings'),
+                       gtk.image_new_from_stock(gtk.STOCK_EXECUTE,
+                                                gtk.ICON_SIZE_MENU))
+        panel.activate_item(self.widget)
+        panel.show()
+
+    def deactivate(self):
+        self._recorder.unsubscribe(self.on_timings_changed)
+        self._window.get_bottom_panel().remove_item(self.widget)
+
+        self._window = None
+        self._recorder = None
+        self.widget = None
+
+    def _update(self):
+        # Changing the check button must not change the recorder again
+        self._record_button.handler_block(self._record_handler_id)
+        self._record_button.set_active(self._recorder.enabled)
+        self._record_button.handler_unblock(self._record_handler_id)
+
+        self._store.clear()
+        for name, phase, calls, seconds, max_seconds, size in self._recorder.summary():
+            self._store.append((name, phase, calls,
+                                '%.1f' % (seconds * 1000),
+                                '%.1f' % (seconds * 1000 / max(calls, 1)),
+                                '%.1f' % (max_seconds * 1000),
+                                size))
+
+    def on_timings_changed(self, recorder):
+        self._update()
+
+    def on_record_toggled(self, button):
+        self._recorder.set_enabled(button.get_active())
+
+    def on_clear_clicked(self, button):
+        self._recorder.clear()
+
+    def on_export_clicked(self, button):
+        chooser = gtk.FileChooserDialog(_('Export Timings'),
+                                        self._window,
+                                        gtk.FILE_CHOOSER_ACTION_SAVE,
+                                        (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL,
+                                         gtk.STOCK_SAVE, gtk.RESPONSE_OK))
+        chooser.set_default_response(gtk.RESPONSE_OK)
+        chooser.set_do_overwrite_confirmation(True)
+        chooser.set_current_name('stringmod-timings.json')
+        if chooser.run() == gtk.RESPONSE_OK:
+            file_name = chooser.get_filename()
+        else:
+            file_name = None
+        chooser.destroy()
+
+        if not file_name:
+            return
+        try:
+            self._recorder.export(file_name)
+        except (IOError, OSError) as error:
+            self._flash_message(_('Cannot export timings: %s') % error)
+            return
+        self._flash_message(_('Timings exported to %s') % file_name)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+#
+#  Template modifiers of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module makes user defined modifiers out of templates, such as
+
+    CStrings: split=lines each="\\"{}\\"" sep=",\\n" prefix="{\\n" suffix="\\n}" escape="\\"\\\\"
+
+The text is split into elements, each element is escaped and formatted,
+and the formatted elements are joined by the separator between the prefix
+and the suffix. Template entries, all optional:
+  split   -- chars, words (with the word tokenizer), lines or text (the
+             whole text is the only element); default words
+  each    -- format of an element: {} is the element, {n} its index from
+             0, {{ and }} are literal braces; default {}
+  sep     -- separator between the elements; default ", "
+  prefix  -- text in front of the elements; default none
+  suffix  -- text after the elements; default none
+  escape  -- characters to escape with a backslash in the elements;
+             default none
+
+Values holding spaces or semicolons are quoted with double quotes; \\n, \\t,
+\\" and \\\\ are escapes inside quotes. Several templates are separated by
+semicolons.
+
+Templates are parsed once and compiled into a transformation specialized
+for their format (see compile_template), so modifying a selection does not
+parse anything.
+
+Classes:
+Template
+
+Functions:
+parse_templates
+compile_template
+
+"""
+
+import re
+from collections import namedtuple, OrderedDict
+
+from . import engine
+
+SPLITS = ('chars', 'words', 'lines', 'text')
+
+# Entries of a template, see the module documentation
+Template = namedtuple('Template', 'split each sep prefix suffix escape')
+
+_defaults = Template(split='words', each='{}', sep=', ', prefix='', suffix='',
+                     escape='')
+
+_name_pattern = re.compile(r'\s*(\w+)\s*:')
+
+_entry_pattern = re.compile(r'\s*(\w+)=("(?:[^"\\]|\\.)*"|[^\s";]*)')
+
+_escape_pattern = re.compile(r'\\(.)', re.DOTALL)
+
+_escapes = { 'n': '\n', 't': '\t' }
+
+_field_pattern = re.compile(r'\{\{|\}\}|\{n?\}|[{}]')
+
+
+def _unquote(value):
+    if value.startswith('"'):
+        return _escape_pattern.sub(lambda match: _escapes.get(match.group(1),
+                                                              match.group(1)),
+                                   value[1:-1])
+    return value
+
+
+def parse_templates(definitions):
+    """
+    Return an ordered dictionary of the Templates of definitions, by name.
+    ValueError is raised for invalid definitions.
+
+    """
+    templates = OrderedDict()
+    pos = 0
+    length = len(definitions)
+    while pos < length:
+        if not definitions[pos:].strip(' \t\n;'):
+            break
+        while definitions[pos] in ' \t\n;':
+            pos += 1
+        match = _name_pattern.match(definitions, pos)
+        if not match:
+            raise ValueError('invalid template at %r, expected Name: entries' %
+                             definitions[pos:pos + 20])
+        name = match.group(1)
+        if name in templates:
+            raise ValueError('template %s defined twice' % name)
+        pos = match.end()
+
+        entries = {}
+        while True:
+            match = _entry_pattern.match(definitions, pos)
+            if not match:
+                break
+            key = match.group(1)
+            if key not in Template._fields:
+                raise ValueError('template %s: unknown entry %s' % (name, key))
+            entries[key] = _unquote(match.group(2))
+            pos = match.end()
+
+        rest = definitions[pos:].lstrip(' \t\n')
+        if rest and not rest.startswith(';'):
+            raise ValueError('template %s: invalid entry at %r' % (name, rest[:20]))
+        pos = length - len(rest)
+
+        template = _defaults._replace(**entries)
+        if template.split not in SPLITS:
+            raise ValueError('template %s: split is one of %s' %
+                             (name, ', '.join(SPLITS)))
+        try:
+            _parse_format(template.each)
+        except ValueError as error:
+            raise ValueError('template %s: %s' % (name, error))
+        templates[name] = template
+    return templates
+
+
+def _parse_format(each):
+    # Return the list of literal texts and fields ('e' for the element, 'n'
+    # for its index) of the element format each
+    parts = []
+    literal = []
+    pos = 0
+    for match in _field_pattern.finditer(each):
+        literal.append(each[pos:match.start()])
+        field = match.group()
+        if field in ('{{', '}}'):
+            literal.append(field[0])
+        elif field in ('{', '}'):
+            raise ValueError('single %s in element format %r' % (field, each))
+        else:
+            parts.append(''.join(literal))
+            parts.append('n' if field == '{n}' else 'e')
+            literal = []
+        pos = match.end()
+    literal.append(each[pos:])
+    parts.append(''.join(literal))
+    return parts
+
+
+def _make_escape(characters):
+    # Return a function escaping characters with a backslash, None if there
+    # are none. The backslash, if escaped, has to be replaced first.
+    if not characters:
+        return None
+    ordered = sorted(set(characters), key=lambda char: char != '\\')
+    replacements = [ (char, '\\' + char) for char in ordered ]
+
+    def escape(element):
+        for char, replacement in replacements:
+            element = element.replace(char, replacement)
+        return element
+    return escape
+
+
+def _make_formatter(each):
+    # Return a function formatting a list of elements, the first of them at
+    # index start, specialized for the fields of each
+    parts = _parse_format(each)
+    fields = parts[1::2]
+
+    if not fields:
+        constant = parts[0]
+        return lambda elements, start: [ constant ] * len(elements)
+    if fields == [ 'e' ]:
+        before, unused, after = parts
+        if not before and not after:
+            return lambda elements, start: elements
+        return lambda elements, start: [ before + element + after
+                                         for element in elements ]
+
+    # General case: a %-format with the fields in order
+    format_string = ''.join(part.replace('%', '%%') if index % 2 == 0 else
+                            ('%(e)s' if part == 'e' else '%(n)d')
+                            for index, part in enumerate(parts))
+    return lambda elements, start: [ format_string % { 'e': element, 'n': index }
+                                     for index, element in enumerate(elements, start) ]
+
+
+def compile_template(template, tokenizer=engine.split_words,
+                     chunk_size=engine.CHUNK_SIZE):
+    """
+    Return the transformation of template, called as transform(text,
+    progress=None) and returning an iterator over the pieces of the result.
+    tokenizer is used to split the text into words.
+
+    """
+    escape = _make_escape(template.escape)
+    formatter = _make_formatter(template.each)
+    separator = template.sep
+    split = template.split
+
+    def transform(text, progress=None):
+        if split == 'chars':
+            elements = engine.split_chars(text)
+        elif split == 'words':
+            elements = tokenizer(text)
+        elif split == 'lines':
+            elements = text.splitlines()
+        else:
+            elements = [ text ]
+
+        yield template.prefix
+        glue = ''
+        total = len(elements)
+        for pos in range(0, total, chunk_size):
+            chunk = elements[pos:pos + chunk_size]
+            if escape:
+                chunk = [ escape(element) for element in chunk ]
+            yield glue + separator.join(formatter(chunk, pos))
+            glue = separator
+            if progress:
+                progress(min(pos + chunk_size, total) / float(total))
+        yield template.suffix
+
+    return transform
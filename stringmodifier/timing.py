@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#
+#  Timings of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module measures where the time of a modification goes: reading the
+selection, transforming it, replacing it in the document, etc. Each
+modification is measured by a Measurement, which times its phases, counts
+their calls and the length of their texts (bytes of utf-8 text under gedit),
+and is kept in the ring buffer of a Recorder once it is finished. It does
+not depend on gtk.
+
+A disabled Recorder hands out a measurement which only calls through, so
+measuring costs a function call per phase when it is off.
+
+Classes:
+Measurement
+Recorder
+
+"""
+
+import json
+import time
+import threading
+from collections import deque, namedtuple, OrderedDict
+
+# Most accurate clock available
+_clock = getattr(time, 'perf_counter', time.time)
+
+# Modifications kept by default
+CAPACITY = 1000
+
+# A finished measurement: its start (seconds since the epoch), the modifier
+# name, the seconds from its start to its end and the (phase, seconds,
+# bytes, calls) tuples of its phases, in the order they were first used.
+# The seconds of a phase exclude the phases measured inside it.
+Record = namedtuple('Record', 'started name seconds phases')
+
+
+class _NullMeasurement(object):
+    # Measurement of a disabled recorder
+
+    def time(self, phase, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def time_iter(self, phase, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def count_iter(self, phase, pieces):
+        return pieces
+
+    def add(self, phase, seconds=0.0, size=0, calls=0):
+        pass
+
+    def finish(self):
+        pass
+
+_null_measurement = _NullMeasurement()
+
+
+class Measurement(object):
+    """
+    Phases of one modification by the modifier name, see Recorder.begin.
+    Phases may be measured inside each other, and from a worker thread
+    while the main thread waits for it.
+
+    """
+
+    def __init__(self, recorder, name):
+        self._recorder = recorder
+        self.name = name
+        self.started = time.time()
+        self._start = _clock()
+        self._phases = OrderedDict()
+        # Seconds measured so far, see _timed
+        self._measured = 0.0
+
+    def add(self, phase, seconds=0.0, size=0, calls=0):
+        """Add seconds, size bytes and calls to phase."""
+        totals = self._phases.get(phase)
+        if totals is None:
+            totals = self._phases[phase] = [ 0.0, 0, 0 ]
+        totals[0] += seconds
+        totals[1] += size
+        totals[2] += calls
+
+    def _timed(self, phase, calls, func, args, kwargs):
+        # Call func, adding its time to phase, less the time of the phases
+        # measured meanwhile
+        measured = self._measured
+        start = _clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = _clock() - start
+            self.add(phase, seconds - (self._measured - measured), 0, calls)
+            self._measured = measured + seconds
+
+    def time(self, phase, func, *args, **kwargs):
+        """Return func(*args, **kwargs), measured as a call of phase."""
+        return self._timed(phase, 1, func, args, kwargs)
+
+    def time_iter(self, phase, func, *args, **kwargs):
+        """
+        Return an iterator over the pieces of func(*args, **kwargs), e.g. a
+        transformation, measured as a call of phase, along with the time
+        taken for each piece and the length of the pieces. func is called
+        at once, so its errors are raised here.
+
+        """
+        pieces = self._timed(phase, 1, func, args, kwargs)
+        return self._iter_timed(phase, iter(pieces))
+
+    def _iter_timed(self, phase, pieces):
+        while True:
+            try:
+                piece = self._timed(phase, 0, next, (pieces,), {})
+            except StopIteration:
+                return
+            self.add(phase, size=len(piece))
+            yield piece
+
+    def count_iter(self, phase, pieces):
+        """Return an iterator over pieces, adding their length to phase."""
+        for piece in pieces:
+            self.add(phase, size=len(piece))
+            yield piece
+
+    def finish(self):
+        """Keep the measurement in the ring buffer of its recorder."""
+        phases = tuple((phase, seconds, size, calls)
+                       for phase, (seconds, size, calls) in self._phases.items())
+        self._recorder._keep(Record(self.started, self.name,
+                                    _clock() - self._start, phases))
+
+
+class Recorder(object):
+    """
+    Ring buffer of the Records of the last capacity measurements. The
+    recorder is disabled when it is made.
+
+    Subscribers are called as callback(recorder) when a record was kept,
+    the records were cleared or the recorder was enabled or disabled.
+
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.enabled = False
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def begin(self, name):
+        """
+        Return the Measurement of a modification by the modifier name, one
+        which only calls through if the recorder is disabled.
+
+        """
+        if not self.enabled:
+            return _null_measurement
+        return Measurement(self, name)
+
+    def set_enabled(self, enabled):
+        """Turn measuring on or off; the kept records are left as they are."""
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self._notify()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def _notify(self):
+        for callback in list(self._subscribers):
+            callback(self)
+
+    def _keep(self, record):
+        with self._lock:
+            self._records.append(record)
+        self._notify()
+
+    def records(self):
+        """Return the list of the kept Records, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+        self._notify()
+
+    def summary(self):
+        """
+        Return the list of (name, phase, calls, seconds, max seconds, bytes)
+        tuples of the kept records, by modifier name and phase. max seconds
+        is the longest time of the phase in a single modification.
+
+        """
+        totals = OrderedDict()
+        for record in self.records():
+            for phase, seconds, size, calls in record.phases:
+                key = (record.name, phase)
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = [ 0, 0.0, 0.0, 0 ]
+                total[0] += calls
+                total[1] += seconds
+                total[2] = max(total[2], seconds)
+                total[3] += size
+        return [ key + tuple(total) for key, total in sorted(totals.items()) ]
+
+    def to_json(self):
+        """Return the records and their summary as a JSON document."""
+        records = [ { 'started': record.started,
+                      'name': record.name,
+                      'seconds': record.seconds,
+                      'phases': [ { 'phase': phase, 'seconds': seconds,
+                                    'bytes': size, 'calls': calls }
+                                  for phase, seconds, size, calls in record.phases ] }
+                    for record in self.records() ]
+        summary = [ { 'name': name, 'phase': phase, 'calls': calls,
+                      'seconds': seconds, 'max_seconds': max_seconds,
+                      'bytes': size }
+                    for name, phase, calls, seconds, max_seconds, size in self.summary() ]
+        return json.dumps({ 'records': records, 'summary': summary },
+                          indent=2, sort_keys=True)
+
+    def export(self, file_name):
+        """Write the records into the file file_name as JSON, see to_json."""
+        with open(file_name, 'w') as json_file:
+            json_file.write(self.to_json())
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+#  Background worker of String Modifiers plugin for gedit
+#
+#  Copyright (C) 2026  String Modifiers plugin contributors
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330,
+#  Boston, MA 02111-1307, USA.
+
+"""
+This module provides a thread running a transformation of the engine module
+away from the gtk main loop.
+
+Classes:
+TransformJob
+
+"""
+
+import threading
+
+
+class TransformJob(threading.Thread):
+    """
+    Run transform(text, progress=callback) on a thread. The transform is one
+    of the engine's iter_* generators; the job stops between two pieces when
+    it is cancelled.
+
+    on_progress(job, fraction) and on_done(job, result) are called from the
+    worker thread; result is None when the job was cancelled or failed. The
+    error of a failed job is kept as the job's error. A ValueError of the
+    transform, e.g. text a reverse modifier can't parse, is not raised any
+    further; other errors are raised after on_done. Callers owning gtk
+    objects have to forward these calls to the main loop themselves.
+
+    """
+
+    def __init__(self, transform, text, on_progress, on_done):
+        threading.Thread.__init__(self, name='StringModTransform')
+        self.daemon = True
+
+        self._transform = transform
+        self._text = text
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self._cancel_event = threading.Event()
+        self.error = None
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _progress(self, fraction):
+        if not self.is_cancelled():
+            self._on_progress(self, fraction)
+
+    def run(self):
+        pieces = []
+        try:
+            for piece in self._transform(self._text, progress=self._progress):
+                if self.is_cancelled():
+                    break
+                pieces.append(piece)
+        except ValueError as error:
+            self._text = None
+            self.error = error
+            self._on_done(self, None)
+            return
+        except Exception as error:
+            # Let the owner clean up and report the failure before the error
+            # is raised
+            self._text = None
+            self.error = error
+            self._on_done(self, None)
+            raise
+
+        # Drop the reference to the (possibly huge) source text early
+        self._text = None
+
+        if self.is_cancelled():
+            self._on_done(self, None)
+        else:
+            self._on_done(self, ''.join(pieces))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the index of the accelerators in use.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import accels
+
+# Key value of 'b' and the control modifier mask of gtk
+KEY_B = 0x62
+CONTROL = 1 << 2
+
+SAVE = '<Actions>/FileActions/FileSave'
+
+
+class AccelRegistryTest(unittest.TestCase):
+
+    def test_paths(self):
+        path = accels.action_path('Braces')
+        self.assertEqual(path, '<Actions>/StringModPluginActions/Braces')
+        self.assertEqual(accels.action_name(path), 'Braces')
+
+    def test_owner(self):
+        registry = accels.AccelRegistry([ (SAVE, KEY_B, CONTROL),
+                                          (accels.action_path('Quotes'), 0, 0) ])
+        braces = accels.action_path('Braces')
+        self.assertEqual(registry.owner(KEY_B, CONTROL, braces), SAVE)
+        self.assertEqual(registry.owner(KEY_B, CONTROL, SAVE), None)
+        self.assertEqual(registry.owner(KEY_B, 0, braces), None)
+        # A key value of 0 is no accelerator
+        self.assertEqual(registry.owner(0, 0, braces), None)
+
+    def test_assign_replaces(self):
+        registry = accels.AccelRegistry([ (SAVE, KEY_B, CONTROL) ])
+        registry.assign(SAVE, KEY_B, 0)
+        self.assertEqual(registry.owner(KEY_B, CONTROL), None)
+        self.assertEqual(registry.owner(KEY_B, 0), SAVE)
+
+    def test_shared_accelerator(self):
+        # The first path in sort order owns an accelerator used twice
+        braces = accels.action_path('Braces')
+        registry = accels.AccelRegistry([ (SAVE, KEY_B, CONTROL),
+                                          (braces, KEY_B, CONTROL) ])
+        self.assertEqual(registry.owner(KEY_B, CONTROL), SAVE)
+        self.assertEqual(registry.owner(KEY_B, CONTROL, SAVE), braces)
+        registry.remove(SAVE)
+        registry.remove(SAVE)
+        self.assertEqual(registry.owner(KEY_B, CONTROL), braces)
+        registry.assign(braces, 0, 0)
+        self.assertEqual(registry.owner(KEY_B, CONTROL), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the edit operations on a document, run on the FakeDocument of the
+benchmarks.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import bufferops
+from stringmodifier.bench import FakeDocument
+
+
+def _select(doc, start, end):
+    doc.select_range(doc.get_iter_at_offset(end), doc.get_iter_at_offset(start))
+
+
+def _selection(doc):
+    start_iter, end_iter = doc.get_selection_bounds()
+    return start_iter.get_offset(), end_iter.get_offset()
+
+
+def _text(doc):
+    return doc.get_text(*doc.get_bounds())
+
+
+class SlicesTest(unittest.TestCase):
+
+    def test_slice_size(self):
+        self.assertEqual(list(bufferops._slices(['abcde', 'fg'], 2)),
+                         [ 'ab', 'cd', 'e', 'fg' ])
+
+    def test_utf8_boundaries(self):
+        # Slices of 2 bytes never cut the 2 and 3 bytes characters
+        chunk = u'a\xe9\u20acb'.encode('utf-8')
+        self.assertEqual(list(bufferops._slices([ chunk ], 2)),
+                         [ b'a', u'\xe9'.encode('utf-8'),
+                           u'\u20ac'.encode('utf-8'), b'b' ])
+
+
+class EncloseSelectionTest(unittest.TestCase):
+
+    def test_enclose(self):
+        doc = FakeDocument('ab cd ef')
+        _select(doc, 3, 5)
+        bufferops.enclose_selection(doc, '<<', '>')
+        self.assertEqual(_text(doc), 'ab <<cd> ef')
+        self.assertEqual(_selection(doc), (3, 8))
+        self.assertEqual(doc.user_actions, 1)
+
+    def test_no_selection(self):
+        doc = FakeDocument('ab')
+        bufferops.enclose_selection(doc, '(', ')')
+        self.assertEqual(_text(doc), 'ab')
+        self.assertEqual(doc.user_actions, 0)
+
+
+class ReplaceRangesTest(unittest.TestCase):
+
+    def test_replace_ranges(self):
+        doc = FakeDocument('one two three')
+        bufferops.replace_ranges(doc, [ (0, 3, '1'), (4, 7, '22'), (8, 13, '') ])
+        self.assertEqual(_text(doc), '1 22 ')
+        self.assertEqual(doc.user_actions, 1)
+
+
+class IterReplaceTest(unittest.TestCase):
+
+    def test_replace(self):
+        doc = FakeDocument('ab cd ef')
+        _select(doc, 3, 5)
+        stream = bufferops.iter_replace(doc, doc.get_iter_at_offset(3),
+                                        doc.get_iter_at_offset(5),
+                                        iter([ 'x' * 5, 'yz' ]), slice_size=2)
+        # One step per slice: xx, xx, x, yz
+        self.assertEqual(len(list(stream)), 4)
+        self.assertEqual(_text(doc), 'ab xxxxxyz ef')
+        self.assertEqual(_selection(doc), (3, 10))
+        self.assertEqual(doc.user_actions, 1)
+
+    def test_lazy_chunks(self):
+        # Chunks are only used as far as the stream is advanced
+        doc = FakeDocument('abc')
+        used = []
+
+        def chunks():
+            for chunk in ('x', 'y'):
+                used.append(chunk)
+                yield chunk
+
+        stream = bufferops.iter_replace(doc, doc.get_iter_at_offset(0),
+                                        doc.get_iter_at_offset(3), chunks())
+        next(stream)
+        self.assertEqual(used, [ 'x' ])
+        self.assertEqual(doc.user_actions, 0)
+        stream.close()
+        self.assertEqual(doc.user_actions, 1)
+
+    def test_failing_chunks(self):
+        doc = FakeDocument('ab cd ef')
+        _select(doc, 3, 5)
+
+        def chunks():
+            yield 'x' * 10
+            raise ValueError('invalid line')
+
+        stream = bufferops.iter_replace(doc, doc.get_iter_at_offset(3),
+                                        doc.get_iter_at_offset(5), chunks(),
+                                        slice_size=4)
+        self.assertRaises(ValueError, list, stream)
+        self.assertEqual(_text(doc), 'ab cd ef')
+        self.assertEqual(_selection(doc), (3, 5))
+        self.assertEqual(doc.user_actions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the result cache.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import sys
+import unittest
+
+from stringmodifier import cache
+
+RESULT = 'x' * 1000
+
+# Budget of the results RESULT of two keys, but not of three
+BUDGET = 2 * sys.getsizeof(RESULT)
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        results = cache.ResultCache(BUDGET)
+        self.assertEqual(results.get('a'), None)
+        results.put('a', RESULT)
+        self.assertEqual(results.get('a'), RESULT)
+        self.assertEqual((results.hits, results.misses), (1, 1))
+        results.clear()
+        self.assertEqual((len(results), results.size, results.hits,
+                          results.misses), (0, 0, 0, 0))
+
+    def test_least_recently_used(self):
+        results = cache.ResultCache(BUDGET)
+        results.put('a', RESULT)
+        results.put('b', RESULT)
+        results.get('a')
+        results.put('c', RESULT)
+        self.assertEqual(results.get('b'), None)
+        self.assertEqual(results.get('a'), RESULT)
+        self.assertEqual(results.get('c'), RESULT)
+        self.assertEqual(results.size, BUDGET)
+
+    def test_set_budget(self):
+        results = cache.ResultCache(BUDGET)
+        results.put('a', RESULT)
+        results.put('b', RESULT)
+        results.set_budget(BUDGET - 1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results.get('b'), RESULT)
+        results.set_budget(0)
+        self.assertEqual((len(results), results.size), (0, 0))
+
+    def test_result_larger_than_budget(self):
+        results = cache.ResultCache(BUDGET)
+        results.put('a', RESULT)
+        results.put('a', RESULT * 3)
+        self.assertEqual(results.get('a'), None)
+        self.assertEqual(results.size, 0)
+
+    def test_iter_put(self):
+        results = cache.ResultCache(BUDGET)
+        pieces = results.iter_put('a', iter([ 'x' * 500 ] * 2))
+        next(pieces)
+        self.assertEqual(len(results), 0)
+        list(pieces)
+        self.assertEqual(results.get('a'), RESULT)
+
+    def test_make_key(self):
+        options = ('"', '"')
+        self.assertEqual(cache.make_key('Braces', options, u'\xe9'),
+                         cache.make_key('Braces', options, u'\xe9'.encode('utf-8')))
+        self.assertNotEqual(cache.make_key('Braces', options, 'a'),
+                            cache.make_key('Quotes', options, 'a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
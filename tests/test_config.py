@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the configuration store and file.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from stringmodifier import config, modifiers
+
+
+class ConfigStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, config.CONFIG_FILE_NAME)
+        self.store = config.ConfigStore(self.file_name)
+        self.changes = []
+        self.store.subscribe(lambda store, changed: self.changes.append(changed))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, text, mtime):
+        # Write the file as another process would, with a new modification
+        # time
+        config_file = open(self.file_name, 'w')
+        config_file.write(text)
+        config_file.close()
+        os.utime(self.file_name, (mtime, mtime))
+
+    def test_set_options(self):
+        options = list(self.store.options)
+        options[modifiers.option_index['WrapColumn']] = '100'
+        options[modifiers.option_index['CustomStart']] = '<'
+        self.assertEqual(self.store.set_options(options),
+                         [ 'CustomStart', 'WrapColumn' ])
+        self.assertEqual(self.store.WrapColumn, 100)
+        self.assertEqual(self.store.options[modifiers.option_index['WrapColumn']], 100)
+        self.assertEqual(self.changes, [ [ 'CustomStart', 'WrapColumn' ] ])
+
+        # Unchanged options are not reported
+        self.assertEqual(self.store.set_options(options), [])
+        self.assertEqual(len(self.changes), 1)
+
+    def test_set_invalid_options(self):
+        options = list(self.store.options)
+        options[modifiers.option_index['CustomStart']] = '<'
+        options[modifiers.option_index['WrapColumn']] = 'wide'
+        self.assertRaises(ValueError, self.store.set_options, options)
+        self.assertEqual(self.store.CustomStart, '"')
+        self.assertEqual(self.changes, [])
+
+    def test_save_and_load(self):
+        options = list(self.store.options)
+        options[modifiers.option_index['WordSort']] = 3
+        self.store.set_options(options)
+        self.store.save()
+
+        other = config.ConfigStore(self.file_name)
+        self.assertEqual(other.load(), [ 'WordSort' ])
+        self.assertEqual(other.options, self.store.options)
+        # The file was not modified since
+        self.assertEqual(other.load(), [])
+
+    def test_load_changed_file(self):
+        self.assertEqual(self.store.load(), [])
+        self._write('CustomEnd=>\nWrapArray=1\nUnknown=2\n', 1000000000)
+        self.assertEqual(self.store.load(), [ 'CustomEnd', 'WrapArray' ])
+        self.assertEqual((self.store.CustomEnd, self.store.WrapArray), ('>', 1))
+        self.assertEqual(self.store.load(), [])
+
+        # Entries missing from the file keep their value
+        self._write('WrapArray=0\n', 1000000001)
+        self.assertEqual(self.store.load(), [ 'WrapArray' ])
+        self.assertEqual(self.store.CustomEnd, '>')
+
+
+if __name__ == '__main__':
+    unittest.main()
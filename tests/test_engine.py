@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the word tokenizers of the engine.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import engine
+
+WORDS = u'caf\xe9 na\xefve \u03a9mega'
+
+
+def _utf8(text):
+    # The text of the plugin under gedit: utf-8 bytes under Python 2
+    if str is bytes:
+        return text.encode('utf-8')
+    return text
+
+
+class TokenizerTest(unittest.TestCase):
+
+    def test_csv(self):
+        tokenizer = engine.get_tokenizer('csv')
+        self.assertEqual(tokenizer('a, "b, c", d'), [ 'a', 'b, c', 'd' ])
+
+    def test_csv_large_field(self):
+        # Larger than the default field size limit of the csv module
+        text = 'word ' * 50000
+        self.assertEqual(engine.get_tokenizer('csv')(text), [ text.strip() ])
+
+    def test_identifiers_utf8(self):
+        tokenizer = engine.get_tokenizer('identifiers')
+        self.assertEqual(tokenizer(_utf8(WORDS + u' 2 x2')),
+                         [ _utf8(word) for word in WORDS.split() ] + [ _utf8(u'x2') ])
+
+    def test_custom_utf8(self):
+        tokenizer = engine.get_tokenizer('custom', r'\W+')
+        self.assertEqual(tokenizer(_utf8(WORDS)),
+                         [ _utf8(word) for word in WORDS.split() ])
+
+
+class EscapeTest(unittest.TestCase):
+
+    def test_javascript_line_ends(self):
+        text = _utf8(u'a\u2028b\u2029\xe9')
+        self.assertEqual(engine.get_escape('javascript', '"')(text),
+                         _utf8(u'a\\u2028b\\u2029\xe9'))
+        self.assertEqual(engine.char_array(text, ('{', '}'), escape='javascript',
+                                           unit='graphemes'),
+                         _utf8(u"{ 'a', '\\u2028', 'b', '\\u2029', '\xe9' }"))
+
+
+class WordArrayTest(unittest.TestCase):
+
+    def test_natural_sort(self):
+        self.assertEqual(engine.word_array('x10 x9 x009 y x1', ('{', '}'),
+                                           sort='natural'),
+                         "{ 'x1', 'x9', 'x009', 'x10', 'y' }")
+
+    def test_caseless_sort_utf8(self):
+        # Non-ASCII letters are folded too: \xc9t\xe9 is \xe9t\xe9
+        text = _utf8(u'\xc9t\xe9 Zed \xe9ta abc')
+        self.assertEqual(engine.word_array(text, ('{', '}'), sort='caseless'),
+                         _utf8(u"{ 'abc', 'Zed', '\xe9ta', '\xc9t\xe9' }"))
+
+    def test_count_frequency(self):
+        self.assertEqual(engine.word_array('b a b c a b', ('{', '}'),
+                                           sort='frequency', count=True),
+                         "{ { 'b', 3 }, { 'a', 2 }, { 'c', 1 } }")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the lookup of the modifiers by the name of their menu action.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import modifiers
+
+
+def _options(**values):
+    options = list(modifiers.default_options)
+    for name, value in values.items():
+        options[modifiers.option_index[name]] = value
+    return options
+
+
+class GetTransformTest(unittest.TestCase):
+
+    def test_per_line(self):
+        self.assertEqual(modifiers.per_line_base('QuotesPerLine'), 'Quotes')
+        self.assertEqual(modifiers.apply('QuotesPerLine', _options(), 'a\nb\n'),
+                         '"a"\n"b"\n')
+        self.assertTrue(modifiers.is_reverse('Array2StrPerLine'))
+
+    def test_pipeline_named_per_line(self):
+        options = _options(Pipelines='Words: lines; WordsPerLine: words | quote')
+        self.assertEqual(modifiers.per_line_base('PipelineWordsPerLine'), None)
+        self.assertEqual(modifiers.apply('PipelineWordsPerLine', options, 'a b'),
+                         '"a", "b"')
+
+    def test_template_named_per_line(self):
+        options = _options(Templates='TagPerLine: split=words each="<{}>" sep=""')
+        self.assertEqual(modifiers.apply('TemplateTagPerLine', options, 'a b'),
+                         '<a><b>')
+        self.assertRaises(KeyError, modifiers.get_transform, 'TemplateTag', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
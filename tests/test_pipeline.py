@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the chars step of the pipelines and templates on multibyte text.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import engine, pipeline, template
+
+TEXT = u'h\xe9€!'
+
+
+def _utf8(text):
+    # The text of the plugin under gedit: utf-8 bytes under Python 2
+    if str is bytes:
+        return text.encode('utf-8')
+    return text
+
+
+class CharsTest(unittest.TestCase):
+
+    def test_split_chars(self):
+        self.assertEqual(list(engine.split_chars(_utf8(TEXT))),
+                         [ _utf8(char) for char in TEXT ])
+        self.assertEqual(engine.split_chars(b'ab\x80'), [ b'a', b'b', b'\x80' ])
+
+    def test_pipeline_chars(self):
+        transform = pipeline.compile_pipeline(pipeline.parse_pipeline('chars | quote'))
+        self.assertEqual(''.join(transform(_utf8(TEXT))),
+                         _utf8(u'"h", "\xe9", "€", "!"'))
+
+    def test_template_chars(self):
+        definition = template.parse_templates('Tags: split=chars each="<{}>" sep=""')
+        transform = template.compile_template(definition['Tags'])
+        self.assertEqual(''.join(transform(_utf8(TEXT))),
+                         _utf8(u'<h><\xe9><€><!>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Round trip tests of the reverse modifiers: the arrays made by the engine are
+turned back into their text by the scanner, for every escaping.
+
+Run with python -m unittest discover tests (or pytest).
+
+"""
+
+import unittest
+
+from stringmodifier import engine, scanner
+
+BRACES = ('{', '}')
+
+PAIRS = [ ('{', '}'), ('[', ']'), ('(', ')'), ('<<', '>>') ]
+
+TEXT = u'Say "hi",\tit\'s a back\\slash\nand h\xe9, € 1'
+
+WORDS = u'alpha beta gamma beta alpha alpha'
+
+
+def _utf8(text):
+    # The text of the plugin under gedit: utf-8 bytes under Python 2
+    if str is bytes:
+        return text.encode('utf-8')
+    return text
+
+
+def _unicode(text):
+    if isinstance(text, bytes):
+        return text.decode('utf-8')
+    return text
+
+
+class ArrayToStringTest(unittest.TestCase):
+
+    def assertRoundTrip(self, array, text, **options):
+        self.assertEqual(_unicode(scanner.array_to_string(array, **options)),
+                         text)
+
+    def test_char_array(self):
+        for escape in engine.ESCAPES:
+            for unit in engine.CHAR_UNITS:
+                array = engine.char_array(_utf8(TEXT), BRACES, escape=escape,
+                                          unit=unit)
+                self.assertRoundTrip(array, TEXT, escape=escape)
+
+    def test_word_array(self):
+        text = u'Say "hi" back\\slash h\xe9'
+        for escape in engine.ESCAPES:
+            array = engine.word_array(_utf8(text), BRACES,
+                                      tokenizer=engine.get_tokenizer('whitespace'),
+                                      escape=escape)
+            self.assertRoundTrip(array, text, escape=escape)
+
+    def test_unique_word_array(self):
+        for escape in engine.ESCAPES:
+            array = engine.word_array(_utf8(WORDS), BRACES, escape=escape,
+                                      unique=True, sort='lexical')
+            self.assertRoundTrip(array, u'alpha beta gamma', escape=escape)
+
+    def test_counted_word_array(self):
+        for escape in engine.ESCAPES:
+            array = engine.word_array(_utf8(WORDS), BRACES, escape=escape,
+                                      count=True, sort='frequency')
+            self.assertRoundTrip(array, u'alpha beta gamma', escape=escape)
+
+    def test_counted_one_letter_words(self):
+        self.assertRoundTrip("{ { 'b', 2 }, { 'a', 1 } }", u'b a')
+        array = engine.word_array('x y x z', BRACES, count=True)
+        self.assertRoundTrip(array, u'x y z')
+
+    def test_wrapped_arrays(self):
+        wrap = engine.Wrap(20, 0, 4)
+        array = engine.char_array(_utf8(TEXT), BRACES, wrap=wrap, escape='c')
+        self.assertRoundTrip(array, TEXT, escape='c')
+        array = engine.byte_array(_utf8(TEXT), BRACES, wrap=wrap)
+        self.assertRoundTrip(array, TEXT)
+
+    def test_byte_array(self):
+        for width in (1, 2, 4):
+            for byteorder in ('little', 'big'):
+                for text in (u'Hello', u'H\xe9llo!', u'ab', u'€'):
+                    array = engine.byte_array(_utf8(text), BRACES, width=width,
+                                              byteorder=byteorder)
+                    self.assertRoundTrip(array, text, width=width,
+                                         byteorder=byteorder)
+
+    def test_byte_array_too_wide(self):
+        array = engine.byte_array('Hello', BRACES, width=2)
+        self.assertRaises(ValueError, scanner.array_to_string, array)
+        self.assertRaises(ValueError, scanner.array_to_string, '{ -1 }')
+
+    def test_spaces_kept(self):
+        self.assertRoundTrip("  { 'a', 'b' }\n", u'  ab\n')
+
+    def test_not_an_array(self):
+        self.assertRaises(ValueError, scanner.array_to_string, 'abc')
+        self.assertRaises(ValueError, scanner.array_to_string, "{ 'a', ")
+
+
+class StripEnclosureTest(unittest.TestCase):
+
+    def test_enclosures(self):
+        for opening, closing in PAIRS:
+            text = opening + u'a (b) c' + closing
+            self.assertEqual(scanner.strip_enclosure(text, [ (opening, closing) ]),
+                             u'a (b) c')
+
+    def test_not_enclosed(self):
+        self.assertRaises(ValueError, scanner.strip_enclosure, u'(a) (b)',
+                          [ ('(', ')') ])
+
+    def test_escaped_quotes(self):
+        for escape in engine.ESCAPES[1:]:
+            quoted = u''.join(engine.iter_enclose(TEXT, '"', '"', escape=escape))
+            self.assertEqual(scanner.strip_enclosure(quoted, [], escape=escape),
+                             TEXT)
+
+
+if __name__ == '__main__':
+    unittest.main()